@@ -1,6 +1,11 @@
 import pygame
-import random
 import sys
+from functools import lru_cache
+
+import dealer_odds
+from shoe import add_value, card_rank, card_suit, card_value
+from rules import (Table, BETTING, INSURANCE, PLAYING, DEALER_TURN, GAME_OVER,
+                   BUST, LOSE, PUSH, WIN, DEALER_BUST, BLACKJACK, SURRENDER)
 
 # --- SETUP ---
 pygame.init()
@@ -14,9 +19,7 @@ WHITE = (255, 255, 255)
 YELLOW = (255, 215, 0)
 BUTTON_COLOR = (40, 40, 40)
 BUTTON_HOVER = (70, 70, 70)
-
-SUITS = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
-RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+DEALER_DELAY = 600  # ms between dealer actions
 
 # --- VECTOR GRAPHICS ENGINE (Suits) ---
 def draw_diamond(surface, x, y, size, color):
@@ -102,73 +105,98 @@ PIXEL_FONT_5x7 = {
     ' ': [0x00] * 7,
     '(': [0x10, 0x20, 0x40, 0x40, 0x40, 0x20, 0x10],
     ')': [0x40, 0x20, 0x10, 0x10, 0x10, 0x20, 0x40],
+    '-': [0x00, 0x00, 0x00, 0xF8, 0x00, 0x00, 0x00],
+    '%': [0xC8, 0xC8, 0x10, 0x20, 0x40, 0x98, 0x98],
 }
 
+# --- GLYPH ATLAS ---
+# Each (scale, color) gets one Surface holding every glyph side by side;
+# characters are blitted from subsurfaces of it instead of drawn bit by bit.
+glyph_atlases = {}
+
+def get_glyph_atlas(scale, color):
+    key = (scale, color)
+    glyphs = glyph_atlases.get(key)
+    if glyphs is None:
+        chars = list(PIXEL_FONT_5x7)
+        atlas = pygame.Surface((len(chars) * 5 * scale, 7 * scale), pygame.SRCALPHA)
+        glyphs = {}
+        for i, char in enumerate(chars):
+            origin_x = i * 5 * scale
+            for r_idx, row_val in enumerate(PIXEL_FONT_5x7[char]):
+                for c_idx in range(5):
+                    if (row_val >> (7 - c_idx)) & 1:
+                        atlas.fill(color, (origin_x + c_idx * scale, r_idx * scale, scale, scale))
+            glyphs[char] = atlas.subsurface((origin_x, 0, 5 * scale, 7 * scale))
+        glyph_atlases[key] = glyphs
+    return glyphs
+
 def draw_pixel_char(surface, char, x, y, scale=2, color=BLACK):
     char = char.upper()
     if char not in PIXEL_FONT_5x7: char = ' '
-    rows = PIXEL_FONT_5x7[char]
-    for r_idx, row_val in enumerate(rows):
-        for c_idx in range(5):
-            if (row_val >> (7 - c_idx)) & 1:
-                pygame.draw.rect(surface, color, (x + c_idx * scale, y + r_idx * scale, scale, scale))
+    surface.blit(get_glyph_atlas(scale, tuple(color))[char], (x, y))
+
+# Whole strings are cached too, so static labels ("DEALER", button captions)
+# and recurring scores cost a single blit per frame
+@lru_cache(maxsize=256)
+def render_pixel_string(text, scale, color):
+    glyphs = get_glyph_atlas(scale, color)
+    img = pygame.Surface((max(len(text), 1) * 6 * scale, 7 * scale), pygame.SRCALPHA)
+    for i, char in enumerate(text):
+        img.blit(glyphs.get(char, glyphs[' ']), (i * 6 * scale, 0)) # 5 width + 1 spacing
+    return img
 
 def draw_pixel_string(surface, text, x, y, scale=2, color=BLACK):
-    cursor_x = x
-    for char in text.upper():
-        draw_pixel_char(surface, char, cursor_x, y, scale, color)
-        cursor_x += (6 * scale) # 5 width + 1 spacing
+    surface.blit(render_pixel_string(text.upper(), scale, tuple(color)), (x, y))
 
 # --- GAME LOGIC ---
-class Card:
-    def __init__(self, rank, suit, hidden=False):
-        self.rank = rank
-        self.suit = suit
-        self.hidden = hidden
-        self.color = RED if suit in ['Hearts', 'Diamonds'] else BLACK
-        
-        if rank in ['J', 'Q', 'K']: self.val = 10
-        elif rank == 'A': self.val = 11
-        else: self.val = int(rank)
-
-class Deck:
-    def __init__(self):
-        self.cards = [Card(r, s) for s in SUITS for r in RANKS]
-        random.shuffle(self.cards)
-    
-    def draw(self):
-        return self.cards.pop()
-
-def calculate_score(hand):
-    score = sum(c.val for c in hand)
-    aces = sum(1 for c in hand if c.rank == 'A')
-    while score > 21 and aces:
-        score -= 10
-        aces -= 1
-    return score
+# Cards, the shoe and hand totals live in shoe.py, the round state machine in
+# rules.py (neither uses pygame)
+def card_color(card):
+    return RED if card_suit(card) in ['Hearts', 'Diamonds'] else BLACK
 
 # --- DRAWING ---
-def draw_card(surface, card, x, y):
+def render_card(surface, card, x, y, hidden=False):
+    # Vector/pixel-font rasterization of one card, used to build the sprite cache
     rect = pygame.Rect(x, y, CARD_W, CARD_H)
     pygame.draw.rect(surface, CARD_COLOR, rect, border_radius=8)
     pygame.draw.rect(surface, BLACK, rect, 2, border_radius=8)
 
-    if card.hidden:
+    if hidden:
         # Pattern Back
         inner = pygame.Rect(x+4, y+4, CARD_W-8, CARD_H-8)
         pygame.draw.rect(surface, (150, 50, 50), inner, border_radius=6)
         pygame.draw.line(surface, WHITE, (x+4, y+4), (x+CARD_W-4, y+CARD_H-4), 2)
         pygame.draw.line(surface, WHITE, (x+CARD_W-4, y+4), (x+4, y+CARD_H-4), 2)
     else:
+        rank, suit, color = card_rank(card), card_suit(card), card_color(card)
         # Rank & Suit (Corner)
-        draw_pixel_string(surface, card.rank, x+6, y+6, 2, card.color)
-        draw_suit_icon(surface, card.suit, x+12, y+28, 12, card.color)
+        draw_pixel_string(surface, rank, x+6, y+6, 2, color)
+        draw_suit_icon(surface, suit, x+12, y+28, 12, color)
         
         # Center Suit
-        draw_suit_icon(surface, card.suit, x+CARD_W//2, y+CARD_H//2, 30, card.color)
+        draw_suit_icon(surface, suit, x+CARD_W//2, y+CARD_H//2, 30, color)
         
         # Bottom Right Rank
-        draw_pixel_string(surface, card.rank, x+CARD_W-22, y+CARD_H-22, 2, card.color)
+        draw_pixel_string(surface, rank, x+CARD_W-22, y+CARD_H-22, 2, color)
+
+# --- CARD SPRITE CACHE ---
+# One pre-rendered Surface per face (keyed by card id) plus the hidden back,
+# built the first time each is needed and blitted from then on.
+card_sprites = {}
+
+def get_card_sprite(card, hidden=False):
+    key = "BACK" if hidden else card
+    sprite = card_sprites.get(key)
+    if sprite is None:
+        sprite = pygame.Surface((CARD_W, CARD_H), pygame.SRCALPHA)
+        render_card(sprite, card, 0, 0, hidden)
+        if pygame.display.get_surface(): sprite = sprite.convert_alpha()
+        card_sprites[key] = sprite
+    return sprite
+
+def draw_card(surface, card, x, y, hidden=False):
+    surface.blit(get_card_sprite(card, hidden), (x, y))
 
 def draw_button(surface, text, x, y, w, h, hover=False):
     col = BUTTON_HOVER if hover else BUTTON_COLOR
@@ -184,62 +212,110 @@ def draw_button(surface, text, x, y, w, h, hover=False):
     draw_pixel_string(surface, text, x + (w-text_px_w)//2, y + 16, 2, WHITE)
     return rect
 
+# --- ODDS OVERLAY ---
+ODDS_CACHE_LIMIT = 200_000  # Memo entries kept before dealer_odds is reset
+
+def odds_lines(table):
+    # Seen from the player's side: the hole card counts as still unknown.
+    # Shoe.counts is kept up to date per card, and dealer_odds memoizes on
+    # the composition, so a query costs a few ms at most.
+    comp = list(table.shoe.counts)
+    if table.dealer_hidden:
+        comp[card_value(table.dealer[0]) - 2] += 1
+        total, soft = add_value(0, False, card_value(table.upcard()))
+    else:
+        total, soft = table.dealer.total, table.dealer.soft
+    comp = tuple(comp)
+    if dealer_odds.cache_size() > ODDS_CACHE_LIMIT: dealer_odds.clear_cache()
+
+    lines = []
+    if table.state == PLAYING:
+        hand = table.current_hand()
+        lines.append(f"BUST ON HIT {dealer_odds.bust_probability(hand.total, hand.soft, comp):.0%}")
+    lines.append("DEALER")
+    dist = dealer_odds.dealer_distribution_from(total, soft, comp)
+    for name, p in zip(dealer_odds.FINAL_TOTALS, dist):
+        lines.append(f"{name:<5}{p:>4.0%}")
+    return lines
+
+def draw_odds(surface, lines):
+    x, y = SCREEN_WIDTH - 210, 50
+    panel = pygame.Surface((190, len(lines) * 20 + 12), pygame.SRCALPHA)
+    panel.fill((0, 0, 0, 150))
+    surface.blit(panel, (x, y))
+    for i, line in enumerate(lines):
+        draw_pixel_string(surface, line, x + 8, y + 8 + i * 20, 2, YELLOW if i == 0 else WHITE)
+
 # --- MAIN LOOP ---
+STARTING_CHIPS = 1000
+
+# Banner text for a finished single-hand round
+OUTCOME_TEXT = {
+    BUST: "BUST! YOU LOSE", LOSE: "DEALER WINS", PUSH: "PUSH", WIN: "YOU WIN",
+    DEALER_BUST: "DEALER BUST! WIN", BLACKJACK: "BLACKJACK! WIN", SURRENDER: "SURRENDERED",
+}
+
+def button_row(labels, y):
+    # Right-aligned row of buttons sized to their captions
+    rects, x = [], SCREEN_WIDTH - 20
+    for text in reversed(labels):
+        w = len(text) * 12 + 24
+        x -= w
+        rects.append(pygame.Rect(x, y, w, 50))
+        x -= 8
+    return rects[::-1]
+
+def round_outcome(table):
+    if table.num_hands == 1: return OUTCOME_TEXT[table.results[0]]
+    if table.net > 0: return f"YOU WIN {int(table.net)}"
+    if table.net < 0: return f"YOU LOSE {int(-table.net)}"
+    return "PUSH"
+
 def main():
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption("Blackjack 21")
     clock = pygame.time.Clock()
 
-    deck = Deck()
-    player_hand = []
-    dealer_hand = []
-    
-    # Game States: BETTING, PLAYING, DEALER_TURN, GAME_OVER
-    state = "BETTING"
+    table = Table()
     outcome = ""
+    dealer_timer = 0  # Timestamp for the dealer's next action
+    show_odds = False
+    odds_key, odds = None, []  # Overlay is recomputed only when a card moves
     
     # Buttons - INCREASED WIDTH FOR DEAL BUTTON
-    btn_hit = pygame.Rect(SCREEN_WIDTH - 280, SCREEN_HEIGHT - 100, 120, 50)
-    btn_stand = pygame.Rect(SCREEN_WIDTH - 140, SCREEN_HEIGHT - 100, 120, 50)
     btn_deal = pygame.Rect(SCREEN_WIDTH//2 - 100, SCREEN_HEIGHT//2 - 25, 200, 50) # Width increased to 200
+    # (caption, key, action, enabled) for the PLAYING and INSURANCE states
+    play_buttons = [
+        ("HIT (H)", pygame.K_h, table.hit, table.can_hit),
+        ("STAND (S)", pygame.K_s, table.stand, table.can_hit),
+        ("DOUBLE (D)", pygame.K_d, table.double, table.can_double),
+        ("SPLIT (P)", pygame.K_p, table.split, table.can_split),
+        ("SURRENDER (R)", pygame.K_r, table.surrender, table.can_surrender),
+    ]
+    insurance_buttons = [
+        ("INSURE (I)", pygame.K_i, lambda: table.insure(True), lambda: True),
+        ("NO (N)", pygame.K_n, lambda: table.insure(False), lambda: True),
+    ]
+    play_rects = button_row([b[0] for b in play_buttons], SCREEN_HEIGHT//2 - 35)
+    insurance_rects = button_row([b[0] for b in insurance_buttons], SCREEN_HEIGHT//2 - 35)
 
-    # Function to trigger HIT action
-    def action_hit():
-        nonlocal state, outcome
-        player_hand.append(deck.draw())
-        if calculate_score(player_hand) > 21:
-            state = "GAME_OVER"
-            outcome = "BUST! YOU LOSE"
-
-    # Function to trigger STAND action
-    def action_stand():
-        nonlocal state
-        state = "DEALER_TURN"
-        dealer_hand[0].hidden = False
-
-    # Function to trigger DEAL action
-    def action_deal():
-        nonlocal state, deck, player_hand, dealer_hand, outcome
-        deck = Deck()
-        player_hand = [deck.draw(), deck.draw()]
-        dealer_hand = [deck.draw(), deck.draw()]
-        dealer_hand[0].hidden = True
-        
-        p_score = calculate_score(player_hand)
-        if p_score == 21:
-            dealer_hand[0].hidden = False
-            d_score = calculate_score(dealer_hand)
-            if d_score == 21:
-                state = "GAME_OVER"; outcome = "PUSH"
-            else:
-                state = "GAME_OVER"; outcome = "BLACKJACK! WIN"
-        else:
-            state = "PLAYING"
+    def current_buttons():
+        if table.state == PLAYING: return zip(play_buttons, play_rects)
+        if table.state == INSURANCE: return zip(insurance_buttons, insurance_rects)
+        return []
+
+    # Run a table action and schedule/announce whatever it led to
+    def act(action):
+        nonlocal outcome, dealer_timer
+        action()
+        if table.state == DEALER_TURN:
+            dealer_timer = pygame.time.get_ticks() + DEALER_DELAY
+        elif table.state == GAME_OVER:
+            outcome = round_outcome(table)
 
     while True:
+        current_time = pygame.time.get_ticks()
         mouse_pos = pygame.mouse.get_pos()
-        hover_hit = btn_hit.collidepoint(mouse_pos)
-        hover_stand = btn_stand.collidepoint(mouse_pos)
         hover_deal = btn_deal.collidepoint(mouse_pos)
 
         for event in pygame.event.get():
@@ -248,82 +324,86 @@ def main():
             
             # --- MOUSE CLICKS ---
             if event.type == pygame.MOUSEBUTTONDOWN:
-                if state == "BETTING":
-                    if hover_deal: action_deal()
-                
-                elif state == "PLAYING":
-                    if hover_hit: action_hit()
-                    elif hover_stand: action_stand()
-                
-                elif state == "GAME_OVER":
-                    if hover_deal: action_deal() # Re-use deal button pos for Play Again
+                if table.state in (BETTING, GAME_OVER):
+                    if hover_deal: act(table.deal) # Re-use deal button pos for Play Again
+                else:
+                    for (_, _, action, enabled), rect in current_buttons():
+                        if rect.collidepoint(mouse_pos) and enabled():
+                            act(action)
+                            break
             
             # --- KEYBOARD SHORTCUTS ---
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
-                    if state == "BETTING" or state == "GAME_OVER":
-                        action_deal()
-                
-                if state == "PLAYING":
-                    if event.key == pygame.K_h:
-                        action_hit()
-                    elif event.key == pygame.K_s:
-                        action_stand()
-
-        # Dealer Logic
-        if state == "DEALER_TURN":
-            pygame.display.flip()
-            pygame.time.delay(600)
-            d_score = calculate_score(dealer_hand)
-            if d_score < 17:
-                dealer_hand.append(deck.draw())
-            else:
-                # End Game
-                p_score = calculate_score(player_hand)
-                if d_score > 21:
-                    outcome = "DEALER BUST! WIN"
-                elif d_score > p_score:
-                    outcome = "DEALER WINS"
-                elif d_score < p_score:
-                    outcome = "YOU WIN"
+                    if table.state in (BETTING, GAME_OVER):
+                        act(table.deal)
+                elif event.key == pygame.K_o:
+                    show_odds = not show_odds
                 else:
-                    outcome = "PUSH"
-                state = "GAME_OVER"
+                    for (_, key, action, enabled), _ in current_buttons():
+                        if event.key == key and enabled():
+                            act(action)
+                            break
+
+        # Dealer Logic (Non-blocking)
+        if table.state == DEALER_TURN and current_time >= dealer_timer:
+            dealer_timer = current_time + DEALER_DELAY
+            act(table.dealer_step)
 
         # --- DRAWING ---
         screen.fill(BG_COLOR)
+        draw_pixel_string(screen, f"CHIPS {int(STARTING_CHIPS + table.bankroll)}", SCREEN_WIDTH - 200, 20, 2, WHITE)
         
         # Dealer Area
         draw_pixel_string(screen, "DEALER", 50, 50, 2, WHITE)
-        for i, card in enumerate(dealer_hand):
-            draw_card(screen, card, 50 + i * (CARD_W + 10), 90)
+        for i, card in enumerate(table.dealer):
+            draw_card(screen, card, 50 + i * (CARD_W + 10), 90, table.dealer_hidden and i == 0)
             
-        if state != "BETTING" and not dealer_hand[0].hidden:
-            d_score = calculate_score(dealer_hand)
-            draw_pixel_string(screen, str(d_score), 200, 50, 2, YELLOW)
+        if table.state != BETTING and not table.dealer_hidden:
+            draw_pixel_string(screen, str(table.dealer.total), 200, 50, 2, YELLOW)
 
-        # Player Area
+        # Player Area (split hands share the width, with overlapping cards)
         draw_pixel_string(screen, "PLAYER", 50, 360, 2, WHITE)
-        for i, card in enumerate(player_hand):
-            draw_card(screen, card, 50 + i * (CARD_W + 10), 400)
-            
-        if state != "BETTING":
-            p_score = calculate_score(player_hand)
-            draw_pixel_string(screen, str(p_score), 200, 360, 2, YELLOW)
+        hands = table.player_hands()
+        slot_w = (SCREEN_WIDTH - 70) // max(len(hands), 1)
+        for h, hand in enumerate(hands):
+            x0 = 50 + h * slot_w
+            step = min(CARD_W + 10, (slot_w - CARD_W - 10) // max(len(hand) - 1, 1))
+            for i, card in enumerate(hand):
+                draw_card(screen, card, x0 + i * step, 400)
+            if len(hands) == 1:
+                draw_pixel_string(screen, str(hand.total), 200, 360, 2, YELLOW)
+                continue
+            label = str(hand.total)
+            if table.state == GAME_OVER: label += " " + table.results[h].replace("_", " ")
+            draw_pixel_string(screen, label, x0, 382, 2, YELLOW)
+            if table.state == PLAYING and h == table.active:
+                pygame.draw.rect(screen, YELLOW, (x0, 548, CARD_W, 6))
 
         # UI Controls
-        if state == "BETTING":
+        if table.state == BETTING:
             draw_button(screen, "DEAL (SPACE)", btn_deal.x, btn_deal.y, btn_deal.w, btn_deal.h, hover_deal)
         
-        elif state == "PLAYING":
-            draw_button(screen, "HIT (H)", btn_hit.x, btn_hit.y, btn_hit.w, btn_hit.h, hover_hit)
-            draw_button(screen, "STAND (S)", btn_stand.x, btn_stand.y, btn_stand.w, btn_stand.h, hover_stand)
+        elif table.state in (PLAYING, INSURANCE):
+            if table.state == INSURANCE:
+                rect = insurance_rects[0]
+                draw_pixel_string(screen, "INSURANCE", rect.x, rect.y - 24, 2, YELLOW)
+            for (text, _, _, enabled), rect in current_buttons():
+                if enabled():
+                    draw_button(screen, text, rect.x, rect.y, rect.w, rect.h, rect.collidepoint(mouse_pos))
             
-        elif state == "GAME_OVER":
+        elif table.state == GAME_OVER:
             # Draw outcome with larger scale
             draw_pixel_string(screen, outcome, SCREEN_WIDTH//2 - (len(outcome)*9), SCREEN_HEIGHT//2 - 50, 3, YELLOW)
             draw_button(screen, "AGAIN (SPACE)", btn_deal.x, btn_deal.y, btn_deal.w, btn_deal.h, hover_deal)
 
+        # Odds Overlay (O)
+        if show_odds and table.state != BETTING:
+            key = (table.shoe.pos, table.dealer_hidden, table.state, table.active)
+            if key != odds_key:
+                odds_key, odds = key, odds_lines(table)
+            draw_odds(screen, odds)
+
         pygame.display.flip()
         clock.tick(30)
 
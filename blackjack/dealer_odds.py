@@ -0,0 +1,136 @@
+import argparse
+import sys
+from functools import lru_cache
+
+from shoe import DEALER_STANDS_ON, DECKS, DECK_COMPOSITION, add_value
+
+# Exact dealer outcome probabilities for a known shoe composition. A shoe is a
+# tuple of 10 counts for card values 2..11 (tens and faces share one slot,
+# Ace = 11), so equal compositions share memoized results.
+
+FINAL_TOTALS = ['17', '18', '19', '20', '21', 'BUST']
+BUST_INDEX = 5
+
+def shoe_composition(decks=DECKS):
+    return tuple(n * decks for n in DECK_COMPOSITION)
+
+def remove_card(comp, value):
+    i = value - 2
+    if not comp[i]: raise ValueError(f"no {value} left in shoe")
+    return comp[:i] + (comp[i] - 1,) + comp[i + 1:]
+
+@lru_cache(maxsize=None)
+def _dealer_from(total, soft, comp):
+    if total >= DEALER_STANDS_ON:
+        dist = [0.0] * 6
+        dist[BUST_INDEX if total > 21 else total - DEALER_STANDS_ON] = 1.0
+        return tuple(dist)
+    n = sum(comp)
+    dist = [0.0] * 6
+    for i, count in enumerate(comp):
+        if not count: continue
+        t, s = add_value(total, soft, i + 2)
+        p = count / n
+        for k, q in enumerate(_dealer_from(t, s, comp[:i] + (count - 1,) + comp[i + 1:])):
+            dist[k] += p * q
+    return tuple(dist)
+
+def dealer_distribution(upcard, comp):
+    # comp is every card the player has not seen, i.e. the shoe plus the hole
+    # card, with the upcard already removed
+    total, soft = add_value(0, False, upcard)
+    return _dealer_from(total, soft, comp)
+
+def dealer_distribution_from(total, soft, comp):
+    # Same, for a dealer hand that already holds more than the upcard
+    return _dealer_from(total, soft, comp)
+
+def bust_probability(total, soft, comp):
+    n = sum(comp)
+    if not n: return 0.0
+    busting = sum(count for i, count in enumerate(comp) if add_value(total, soft, i + 2)[0] > 21)
+    return busting / n
+
+# --- EXPECTED VALUES ---
+def stand_ev(p_total, upcard, comp):
+    if p_total > 21: return -1.0
+    dist = dealer_distribution(upcard, comp)
+    ev = dist[BUST_INDEX]
+    for k in range(5):
+        d_total = DEALER_STANDS_ON + k
+        if d_total < p_total: ev += dist[k]
+        elif d_total > p_total: ev -= dist[k]
+    return ev
+
+@lru_cache(maxsize=None)
+def hit_ev(p_total, soft, upcard, comp):
+    # EV of taking one card and then playing the better of hit/stand
+    n = sum(comp)
+    ev = 0.0
+    for i, count in enumerate(comp):
+        if not count: continue
+        t, s = add_value(p_total, soft, i + 2)
+        if t > 21:
+            ev -= count / n
+            continue
+        rest = comp[:i] + (count - 1,) + comp[i + 1:]
+        best = stand_ev(t, upcard, rest)
+        if t < 21: best = max(best, hit_ev(t, s, upcard, rest))
+        ev += count / n * best
+    return ev
+
+def double_ev(p_total, soft, upcard, comp):
+    # Twice the stake on exactly one more card, then stand
+    n = sum(comp)
+    ev = 0.0
+    for i, count in enumerate(comp):
+        if not count: continue
+        t, _ = add_value(p_total, soft, i + 2)
+        ev += count / n * stand_ev(t, upcard, comp[:i] + (count - 1,) + comp[i + 1:])
+    return 2 * ev
+
+def ev_table(comp):
+    # {(player_total, soft, upcard): (stand_ev, hit_ev)}. Only the upcard is
+    # removed from the shoe; pass an exact composition to stand_ev/hit_ev
+    # when the player's own cards should be taken out as well.
+    table = {}
+    for upcard in range(2, 12):
+        if not comp[upcard - 2]: continue
+        rest = remove_card(comp, upcard)
+        for soft in (False, True):
+            for p_total in range(12 if soft else 4, 22):
+                table[(p_total, soft, upcard)] = (stand_ev(p_total, upcard, rest),
+                                                  hit_ev(p_total, soft, upcard, rest))
+    return table
+
+def clear_cache():
+    _dealer_from.cache_clear()
+    hit_ev.cache_clear()
+
+def cache_size():
+    return _dealer_from.cache_info().currsize + hit_ev.cache_info().currsize
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exact Blackjack dealer outcome tables")
+    parser.add_argument('--decks', type=int, default=DECKS)
+    parser.add_argument('--ev', action='store_true', help="also print hit/stand EV for hard totals")
+    args = parser.parse_args(argv)
+
+    comp = shoe_composition(args.decks)
+    print("UP  " + "".join(f"{name:>8}" for name in FINAL_TOTALS))
+    for upcard in range(2, 12):
+        dist = dealer_distribution(upcard, remove_card(comp, upcard))
+        print(f"{'A' if upcard == 11 else upcard:>2}  " + "".join(f"{p:8.4f}" for p in dist))
+
+    if args.ev:
+        table = ev_table(comp)
+        print("\nHARD" + "".join(f"{'A' if u == 11 else u:>6}" for u in range(2, 12)))
+        for p_total in range(4, 22):
+            cells = []
+            for upcard in range(2, 12):
+                stand, hit = table[(p_total, False, upcard)]
+                cells.append(f"{'H' if hit > stand else 'S':>6}")
+            print(f"{p_total:>4}" + "".join(cells))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,171 @@
+import argparse
+import os
+import sys
+import time
+from statistics import NormalDist
+
+import numpy as np
+
+import dealer_odds
+from shoe import DECKS
+from simulator import (ACTION_NAMES, BATCH_SIZE, DECK_VALUES, DOUBLE, HIT,
+                       MAX_ROUND_CARDS, PAYOUTS, STAND, ShoeBatch, play_round, threshold_policy)
+
+# Strategy search for Blackjack using common random numbers: every candidate
+# policy is played against the same pre-generated hands, so EV differences
+# are measured on identical cards and need far fewer hands to resolve.
+# Each hand is one round dealt from a freshly shuffled shoe (a continuous
+# shuffler); keeping rounds independent is what keeps the cards aligned
+# between policies that draw different numbers of cards. Only the first
+# MAX_ROUND_CARDS of each shuffle can be dealt, so only those are stored.
+# Hands are cached on disk as .npy files and memory-mapped on later runs.
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "shoe_cache")
+Z = 1.96  # 95% confidence intervals
+ALPHA = 0.05  # Family-wise error rate for one pass of the strategy search
+
+# --- HANDS ---
+def load_hands(hands, decks=DECKS, seed=0, cache_dir=CACHE_DIR):
+    path = os.path.join(cache_dir, f"hands_{decks}d_{hands}_{seed}.npy")
+    if os.path.exists(path):
+        return np.load(path, mmap_mode='r')
+    rng = np.random.default_rng(seed)
+    cards = np.empty((hands, MAX_ROUND_CARDS), dtype=np.int8)
+    for start in range(0, hands, BATCH_SIZE):
+        n = min(BATCH_SIZE, hands - start)
+        shoes = rng.permuted(np.tile(DECK_VALUES, (n, decks)), axis=1)
+        cards[start:start + n] = shoes[:, :MAX_ROUND_CARDS]
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f:
+        np.save(f, cards)
+    os.replace(tmp, path)
+    return cards
+
+def play_hands(cards, policy):
+    # Units won per hand
+    net = np.empty(len(cards))
+    for start in range(0, len(cards), BATCH_SIZE):
+        batch = np.asarray(cards[start:start + BATCH_SIZE])
+        shoe = ShoeBatch(len(batch), 1, None, batch)
+        outcome, _, _, stake = play_round(shoe, np.arange(len(batch)), policy)
+        net[start:start + len(batch)] = PAYOUTS[outcome] * stake
+    return net
+
+# --- STATISTICS ---
+def ev_interval(net, z=Z):
+    return net.mean(), z * net.std(ddof=1) / np.sqrt(len(net))
+
+def diff_interval(a, b, z=Z):
+    # Paired: both policies played the same hands
+    return ev_interval(a - b, z)
+
+def bonferroni_z(comparisons, alpha=ALPHA):
+    # Two-sided z for `comparisons` tests with family-wise error alpha
+    return NormalDist().inv_cdf(1 - alpha / (2 * comparisons))
+
+# --- POLICIES ---
+def decision_cells():
+    for upcard in range(2, 12):
+        for p_total in range(4, 22):
+            yield p_total, 0, upcard
+        for p_total in range(12, 22):
+            yield p_total, 1, upcard
+
+def basic_policy(decks=DECKS):
+    # Composition-exact hit/stand/double choice for a full shoe (upcard removed)
+    policy = threshold_policy(17)
+    comp = dealer_odds.shoe_composition(decks)
+    for (p_total, soft, upcard), (stand, hit) in dealer_odds.ev_table(comp).items():
+        rest = dealer_odds.remove_card(comp, upcard)
+        double = dealer_odds.double_ev(p_total, soft, upcard, rest)
+        best = max((stand, STAND), (hit, HIT), (double, DOUBLE))
+        policy[p_total, int(soft), upcard] = best[1]
+    dealer_odds.clear_cache()
+    return policy
+
+def improve(policy, cards, holdout, passes=1, log=print):
+    # Coordinate search: try every other action in every decision cell on
+    # `cards`. A pass tests hundreds of changes, so a change has to clear a
+    # Bonferroni-corrected interval there, and then again on the held-out
+    # hands, which the screening never saw; only then is it kept. Without
+    # the confirmation, changes that won on this sample by luck would
+    # compound as each one becomes the new baseline.
+    policy = policy.copy()
+    cells = list(decision_cells())
+    z = bonferroni_z(2 * len(cells))
+    current, current_holdout = play_hands(cards, policy), play_hands(holdout, policy)
+    for _ in range(passes):
+        changed = 0
+        for cell in cells:
+            for action in (STAND, HIT, DOUBLE):
+                if action == policy[cell]: continue
+                candidate = policy.copy()
+                candidate[cell] = action
+                result = play_hands(cards, candidate)
+                diff, ci = diff_interval(result, current, z)
+                if diff <= ci: continue
+                confirm = play_hands(holdout, candidate)
+                held_diff, held_ci = diff_interval(confirm, current_holdout, z)
+                verdict = "kept" if held_diff > held_ci else "not confirmed"
+                log(f"  {format_cell(cell)}: {ACTION_NAMES[policy[cell]]} -> {ACTION_NAMES[action]} "
+                    f"{diff:+.5f} ±{ci:.5f}, held out {held_diff:+.5f} ±{held_ci:.5f}: {verdict}")
+                if held_diff > held_ci:
+                    policy, current, current_holdout = candidate, result, confirm
+                    changed += 1
+        if not changed: break
+    return policy
+
+def format_cell(cell):
+    p_total, soft, upcard = cell
+    return f"{'soft' if soft else 'hard'} {p_total} vs {'A' if upcard == 11 else upcard}"
+
+def print_policy(policy):
+    header = "".join(f"{'A' if u == 11 else u:>3}" for u in range(2, 12))
+    for soft, totals in ((0, range(4, 22)), (1, range(12, 22))):
+        print(("SOFT" if soft else "HARD") + header)
+        for p_total in totals:
+            print(f"{p_total:>4}" + "".join(f"{ACTION_NAMES[policy[p_total, soft, u]]:>3}" for u in range(2, 12)))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare Blackjack policies on common random numbers")
+    parser.add_argument('--hands', type=int, default=1_000_000)
+    parser.add_argument('--decks', type=int, default=DECKS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--holdout', type=int, default=None,
+                        help="hands (dealt from seed + 1) that confirm search changes (default: --hands)")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--search', action='store_true', help="improve the best policy cell by cell")
+    parser.add_argument('--save', help="write the best policy table to this .npy file")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    cards = load_hands(args.hands, args.decks, args.seed, args.cache_dir)
+    print(f"{args.hands} hands ready in {time.perf_counter() - start:.2f}s")
+
+    policies = {"basic": basic_policy(args.decks)}
+    for stand_on in range(12, 18):
+        policies[f"stand on {stand_on}"] = threshold_policy(stand_on)
+
+    results = {name: play_hands(cards, policy) for name, policy in policies.items()}
+    baseline = results["basic"]
+    print(f"{'POLICY':<12}{'EV':>10}{'±95%':>9}{'VS BASIC':>11}{'±95%':>9}")
+    for name, result in results.items():
+        ev, ci = ev_interval(result)
+        diff, diff_ci = diff_interval(result, baseline)
+        print(f"{name:<12}{ev:>+10.4f}{ci:>9.4f}{diff:>+11.4f}{diff_ci:>9.4f}")
+
+    best_name = max(results, key=lambda name: ev_interval(results[name])[0])
+    best = policies[best_name]
+    if args.search:
+        print(f"searching from '{best_name}'")
+        holdout = load_hands(args.holdout or args.hands, args.decks, args.seed + 1, args.cache_dir)
+        best = improve(best, cards, holdout)
+        ev, ci = ev_interval(play_hands(cards, best))
+        print(f"searched policy EV {ev:+.4f} ±{ci:.4f}")
+    print_policy(best)
+    if args.save:
+        np.save(args.save, best)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,220 @@
+import argparse
+import random
+import sys
+import time
+
+from shoe import DEALER_STANDS_ON, Shoe, Hand, card_value
+
+# Blackjack rules as a pure state machine (no pygame). The GUI drives it one
+# action per click and one dealer_step() per timer tick; simulations drive
+# it in a tight loop through play_round().
+#
+# House rules (same as the original main()): the dealer does not peek, draws
+# below 17 and stands on all 17s, and hands are settled on totals alone.
+# On top of that: double on any two cards (also after a split), split equal
+# values up to MAX_HANDS hands (split Aces get one card each), surrender the
+# first two cards for half the bet, and insurance when the upcard is an Ace.
+
+# Round states (same names as the GUI)
+BETTING, INSURANCE, PLAYING, DEALER_TURN, GAME_OVER = "BETTING", "INSURANCE", "PLAYING", "DEALER_TURN", "GAME_OVER"
+
+# Hand results
+BUST, LOSE, PUSH, WIN, DEALER_BUST, BLACKJACK, SURRENDER = "BUST", "LOSE", "PUSH", "WIN", "DEALER_BUST", "BLACKJACK", "SURRENDER"
+PAYOUTS = {BUST: -1, LOSE: -1, PUSH: 0, WIN: 1, DEALER_BUST: 1, BLACKJACK: 1.5, SURRENDER: -0.5}
+
+MAX_HANDS = 4
+
+class Table:
+    def __init__(self, shoe=None, bet=10):
+        self.shoe = shoe or Shoe()
+        self.bet = bet
+        self.bankroll = 0  # Net winnings over all rounds
+
+        # Hands are allocated once and cleared between rounds
+        self.hands = [Hand() for _ in range(MAX_HANDS)]
+        self.bets = [0] * MAX_HANDS
+        self.results = [None] * MAX_HANDS
+        self.finished = [False] * MAX_HANDS
+        self.num_hands = 0
+        self.active = 0
+        self.dealer = Hand()
+        self.dealer_hidden = False
+        self.insurance = 0
+        self.net = 0  # Winnings of the current round
+        self.state = BETTING
+
+    # --- QUERIES ---
+    def player_hands(self):
+        return self.hands[:self.num_hands]
+
+    def current_hand(self):
+        return self.hands[self.active]
+
+    def upcard(self):
+        return self.dealer[1]
+
+    def can_hit(self):
+        return self.state == PLAYING
+
+    def can_double(self):
+        return self.state == PLAYING and len(self.hands[self.active]) == 2
+
+    def can_split(self):
+        hand = self.hands[self.active]
+        return (self.state == PLAYING and len(hand) == 2 and self.num_hands < MAX_HANDS
+                and card_value(hand[0]) == card_value(hand[1]))
+
+    def can_surrender(self):
+        return self.state == PLAYING and self.num_hands == 1 and len(self.hands[0]) == 2
+
+    def _require(self, allowed, action):
+        if not allowed: raise ValueError(f"cannot {action} in state {self.state}")
+
+    # --- ACTIONS ---
+    def deal(self):
+        self._require(self.state in (BETTING, GAME_OVER), "deal")
+        if self.shoe.needs_shuffle(): self.shoe.shuffle()
+        for i in range(MAX_HANDS):
+            self.hands[i].clear()
+            self.bets[i] = 0
+            self.results[i] = None
+            self.finished[i] = False
+        self.dealer.clear()
+        self.num_hands, self.active = 1, 0
+        self.bets[0] = self.bet
+        self.insurance = 0
+        self.net = 0
+
+        # Deal order matches the original action_deal(): player, player, hole, up
+        player = self.hands[0]
+        player.add(self.shoe.draw()); player.add(self.shoe.draw())
+        self.dealer.add(self.shoe.draw()); self.dealer.add(self.shoe.draw())
+        self.dealer_hidden = True
+
+        if player.total == 21:
+            self.results[0] = PUSH if self.dealer.total == 21 else BLACKJACK
+            self._finish()
+        elif card_value(self.upcard()) == 11:
+            self.state = INSURANCE
+        else:
+            self.state = PLAYING
+
+    def insure(self, take=True):
+        self._require(self.state == INSURANCE, "insure")
+        if take: self.insurance = self.bet / 2
+        self.state = PLAYING
+
+    def hit(self):
+        self._require(self.can_hit(), "hit")
+        hand = self.hands[self.active]
+        hand.add(self.shoe.draw())
+        if hand.total > 21:
+            self.results[self.active] = BUST
+            self._advance()
+
+    def stand(self):
+        self._require(self.state == PLAYING, "stand")
+        self._advance()
+
+    def double(self):
+        self._require(self.can_double(), "double")
+        self.bets[self.active] *= 2
+        hand = self.hands[self.active]
+        hand.add(self.shoe.draw())
+        if hand.total > 21: self.results[self.active] = BUST
+        self._advance()
+
+    def split(self):
+        self._require(self.can_split(), "split")
+        new_index = self.num_hands
+        hand, new = self.hands[self.active], self.hands[new_index]
+        card, moved = hand[0], hand[1]
+        hand.clear(); hand.add(card)
+        new.add(moved)
+        self.bets[new_index] = self.bets[self.active]
+        self.num_hands += 1
+        hand.add(self.shoe.draw())
+        new.add(self.shoe.draw())
+        if card_value(card) == 11:
+            # Split Aces receive one card each and stand
+            self.finished[new_index] = True
+            self._advance()
+
+    def surrender(self):
+        self._require(self.can_surrender(), "surrender")
+        self.results[0] = SURRENDER
+        self._advance()
+
+    def _advance(self):
+        # Finish the current hand and move to the next one that needs playing
+        self.finished[self.active] = True
+        for i in range(self.num_hands):
+            if not self.finished[i]:
+                self.active = i
+                return
+        self.dealer_hidden = False
+        if all(r is not None for r in self.results[:self.num_hands]):
+            self._finish()  # Everything busted or surrendered, dealer does not draw
+        else:
+            self.state = DEALER_TURN
+
+    def dealer_step(self):
+        # One dealer action: draw a card, or settle the round once at 17+
+        self._require(self.state == DEALER_TURN, "play dealer")
+        if self.dealer.total < DEALER_STANDS_ON:
+            self.dealer.add(self.shoe.draw())
+            return
+        d_score = self.dealer.total
+        for i in range(self.num_hands):
+            if self.results[i] is not None: continue
+            p_score = self.hands[i].total
+            if d_score > 21: self.results[i] = DEALER_BUST
+            elif d_score > p_score: self.results[i] = LOSE
+            elif d_score < p_score: self.results[i] = WIN
+            else: self.results[i] = PUSH
+        self._finish()
+
+    def _finish(self):
+        self.dealer_hidden = False
+        net = sum(PAYOUTS[self.results[i]] * self.bets[i] for i in range(self.num_hands))
+        if self.insurance:
+            net += 2 * self.insurance if self.dealer.is_blackjack() else -self.insurance
+        self.net = net
+        self.bankroll += net
+        self.state = GAME_OVER
+
+# --- BATCH PLAY ---
+def dealer_policy(table):
+    # Mimic the dealer: hit below 17, never double, split or insure
+    if table.state == INSURANCE: return "decline"
+    return "hit" if table.current_hand().total < DEALER_STANDS_ON else "stand"
+
+def play_round(table, policy):
+    # policy(table) returns one of: hit, stand, double, split, surrender,
+    # insure, decline
+    table.deal()
+    while table.state in (INSURANCE, PLAYING):
+        action = policy(table)
+        if action == "insure": table.insure(True)
+        elif action == "decline": table.insure(False)
+        else: getattr(table, action)()
+    while table.state == DEALER_TURN:
+        table.dealer_step()
+    return table.net
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play Blackjack rounds through the rules engine")
+    parser.add_argument('--rounds', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    table = Table(Shoe(rng=random.Random(args.seed)), bet=1)
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        play_round(table, dealer_policy)
+    elapsed = time.perf_counter() - start
+    print(f"{args.rounds} rounds in {elapsed:.2f}s ({args.rounds / max(elapsed, 1e-9):,.0f} rounds/s)")
+    print(f"EV per round {table.bankroll / max(args.rounds, 1):+.4f}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
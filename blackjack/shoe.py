@@ -0,0 +1,96 @@
+import random
+from array import array
+
+# Compact card model shared by the GUI and the headless tools (no pygame).
+# A card is a small integer: suit * 13 + rank index.
+
+SUITS = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+RANK_VALUES = [2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 11]
+DECK_SIZE = 52
+DECKS = 6
+PENETRATION = 0.75  # Reshuffle once 3/4 of the shoe has been dealt
+DEALER_STANDS_ON = 17  # Dealer draws below this total and stands on all 17s
+
+CARD_VALUES = bytes(RANK_VALUES[c % 13] for c in range(DECK_SIZE))
+# Cards per value slot (2..11) in one deck, the layout used by dealer_odds
+DECK_COMPOSITION = [4, 4, 4, 4, 4, 4, 4, 4, 16, 4]
+
+def card_rank(card):
+    return RANKS[card % 13]
+
+def card_suit(card):
+    return SUITS[card // 13]
+
+def card_value(card):
+    return CARD_VALUES[card]
+
+def add_value(total, soft, value):
+    # Same result as summing the hand and demoting Aces while over 21: at most
+    # one Ace is ever counted as 11, so a single soft flag is enough
+    if value == 11 and soft: value = 1
+    total += value
+    soft = soft or value == 11
+    if total > 21 and soft:
+        total -= 10
+        soft = False
+    return total, soft
+
+class Shoe:
+    # Multi-deck shoe stored as a byte array. The whole shoe is shuffled once
+    # and dealt by advancing an index; it is reshuffled once the cut card
+    # (penetration * size) has been reached. counts[value - 2] tracks the
+    # undealt composition and is updated in O(1) per card.
+    def __init__(self, decks=DECKS, penetration=PENETRATION, rng=None):
+        self.cards = array('B', range(DECK_SIZE)) * decks
+        self.decks = decks
+        self.cut = int(len(self.cards) * penetration)
+        self.rng = rng or random
+        self.shuffle()
+
+    def shuffle(self):
+        self.rng.shuffle(self.cards)
+        self.pos = 0
+        self.counts = [n * self.decks for n in DECK_COMPOSITION]
+
+    def needs_shuffle(self):
+        return self.pos >= self.cut
+
+    def remaining(self):
+        return len(self.cards) - self.pos
+
+    def draw(self):
+        card = self.cards[self.pos]
+        self.pos += 1
+        self.counts[CARD_VALUES[card] - 2] -= 1
+        return card
+
+class Hand:
+    # Cards plus a running total that is updated as each card is added
+    __slots__ = ('cards', 'total', 'soft')
+
+    def __init__(self):
+        self.cards = array('B')
+        self.total = 0
+        self.soft = False
+
+    def add(self, card):
+        self.cards.append(card)
+        self.total, self.soft = add_value(self.total, self.soft, CARD_VALUES[card])
+
+    def clear(self):
+        del self.cards[:]
+        self.total = 0
+        self.soft = False
+
+    def is_blackjack(self):
+        return len(self.cards) == 2 and self.total == 21
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def __getitem__(self, index):
+        return self.cards[index]
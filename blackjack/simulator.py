@@ -0,0 +1,224 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from shoe import CARD_VALUES, DEALER_STANDS_ON, DECK_SIZE, DECKS, PENETRATION
+
+# Headless Blackjack simulator. Plays the same rules as main() in blackjack.py
+# (multi-deck shoe with a cut card, player/dealer naturals, dealer draws
+# below 17, bust/push/win resolution) on batches of shoes encoded as NumPy
+# arrays.
+
+# --- CARD ENCODING ---
+# Shoes hold card values (Ace counts 11), one deck per shoe.CARD_VALUES
+DECK_VALUES = np.frombuffer(CARD_VALUES, dtype=np.int8)
+
+# A round never needs more than 39 cards: the player can draw at most 22
+# (every card is worth at least 1) and the dealer at most 17.
+MAX_ROUND_CARDS = 39
+BATCH_SIZE = 1 << 16
+
+# Hand totals above 21 are kept (up to 31) so busts land in their own column
+MAX_TOTAL = 32
+UPCARDS = 12  # Indexed by card value, 2..11
+
+# --- OUTCOMES ---
+BUST, LOSE, PUSH, WIN, DEALER_BUST, BLACKJACK = range(6)
+OUTCOME_NAMES = ['BUST', 'LOSE', 'PUSH', 'WIN', 'DEALER_BUST', 'BLACKJACK']
+PAYOUTS = np.array([-1.0, -1.0, 0.0, 1.0, 1.0, 1.5])
+
+# --- POLICIES ---
+# A policy is an action table policy[total, soft, upcard]. DOUBLE only applies
+# to the first two cards; on later decisions it is played as HIT.
+STAND, HIT, DOUBLE = 0, 1, 2
+ACTION_NAMES = ['S', 'H', 'D']
+
+def threshold_policy(stand_on=17):
+    table = np.zeros((MAX_TOTAL, 2, UPCARDS), dtype=np.int8)
+    table[:min(stand_on, 22)] = HIT
+    table[22:] = STAND
+    return table
+
+# --- HAND TOTALS ---
+def add_card(total, aces, value):
+    # Incremental version of calculate_score(): aces are counted as 11 and
+    # demoted to 1 while the hand is over 21. Two passes are enough because
+    # the total was at most 21 before the card was added.
+    total = total + value
+    aces = aces + (value == 11)
+    for _ in range(2):
+        over = (total > 21) & (aces > 0)
+        total = total - 10 * over
+        aces = aces - over
+    return total, aces
+
+# --- SHOES ---
+class ShoeBatch:
+    # One row per shoe. Cards are shuffled lazily: each draw swaps a random
+    # undealt card into the dealing position (a Fisher-Yates step), so only
+    # the cards actually dealt cost anything. With rng=None the rows are
+    # taken as already shuffled (e.g. pre-generated shoes) and read in order.
+    def __init__(self, n, decks, rng, cards=None):
+        self.cards = np.tile(DECK_VALUES, (n, decks)) if cards is None else cards
+        self.pos = np.zeros(n, dtype=np.int64)
+        self.size = DECK_SIZE * decks
+        self.rng = rng
+
+    def draw(self, rows):
+        pos = self.pos[rows]
+        if self.rng is None:
+            self.pos[rows] = pos + 1
+            return self.cards[rows, pos].astype(np.int16)
+        swap = pos + self.rng.integers(0, self.size - pos)
+        picked = self.cards[rows, swap]
+        self.cards[rows, swap] = self.cards[rows, pos]
+        self.cards[rows, pos] = picked
+        self.pos[rows] = pos + 1
+        return picked.astype(np.int16)
+
+def play_round(shoe, rows, policy):
+    # Deal order matches action_deal(): player, player, dealer hole, dealer up
+    zero = np.zeros(len(rows), dtype=np.int16)
+    p_total, p_aces = add_card(zero, zero, shoe.draw(rows))
+    p_total, p_aces = add_card(p_total, p_aces, shoe.draw(rows))
+    d_total, d_aces = add_card(zero, zero, shoe.draw(rows))
+    upcard = shoe.draw(rows)
+    d_total, d_aces = add_card(d_total, d_aces, upcard)
+
+    outcome = np.full(len(rows), LOSE, dtype=np.int8)
+    stake = np.ones(len(rows), dtype=np.int8)
+    natural = p_total == 21
+    outcome[natural] = np.where(d_total[natural] == 21, PUSH, BLACKJACK)
+
+    # Player turn: a double takes exactly one card at twice the stake
+    action = np.where(natural, STAND, policy[p_total, (p_aces > 0).astype(np.int8), upcard])
+    doubling = np.flatnonzero(action == DOUBLE)
+    if len(doubling):
+        stake[doubling] = 2
+        p_total[doubling], p_aces[doubling] = add_card(p_total[doubling], p_aces[doubling], shoe.draw(rows[doubling]))
+    hitting = action == HIT
+    while hitting.any():
+        idx = np.flatnonzero(hitting)
+        total, aces = add_card(p_total[idx], p_aces[idx], shoe.draw(rows[idx]))
+        p_total[idx], p_aces[idx] = total, aces
+        hitting[idx] = policy[total, (aces > 0).astype(np.int8), upcard[idx]] != STAND
+    bust = ~natural & (p_total > 21)
+    outcome[bust] = BUST
+
+    # Dealer turn (DEALER_TURN in main)
+    live = ~natural & ~bust
+    drawing = live & (d_total < DEALER_STANDS_ON)
+    while drawing.any():
+        idx = np.flatnonzero(drawing)
+        total, aces = add_card(d_total[idx], d_aces[idx], shoe.draw(rows[idx]))
+        d_total[idx], d_aces[idx] = total, aces
+        drawing[idx] = total < DEALER_STANDS_ON
+
+    outcome[live & (d_total > 21)] = DEALER_BUST
+    outcome[live & (d_total <= 21) & (d_total < p_total)] = WIN
+    outcome[live & (d_total == p_total)] = PUSH
+    return outcome, p_total, upcard, stake
+
+# --- STATISTICS ---
+class SimulationStats:
+    def __init__(self, counts=None, net=0.0):
+        if counts is None:
+            counts = np.zeros((len(OUTCOME_NAMES), MAX_TOTAL, UPCARDS), dtype=np.int64)
+        # counts[outcome, player_total, dealer_upcard]
+        self.counts = counts
+        self.net = net  # Units won, doubles count twice
+
+    def __add__(self, other):
+        return SimulationStats(self.counts + other.counts, self.net + other.net)
+
+    def record(self, outcome, p_total, upcard, stake):
+        flat = (outcome.astype(np.int64) * MAX_TOTAL + p_total) * UPCARDS + upcard
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+        self.net += float(PAYOUTS[outcome] @ stake)
+
+    @property
+    def hands(self):
+        return int(self.counts.sum())
+
+    def outcome_totals(self):
+        return dict(zip(OUTCOME_NAMES, self.counts.sum(axis=(1, 2)).tolist()))
+
+    def ev(self):
+        if not self.hands: return 0.0
+        return self.net / self.hands
+
+def simulate(shoes, decks=DECKS, penetration=PENETRATION, policy=None, rng=None):
+    # Plays every shoe until the cut card (decks * 52 * penetration cards
+    # dealt), one round at a time, like Shoe.needs_shuffle() in the GUI.
+    # penetration=0 deals a single hand per shoe.
+    if policy is None: policy = threshold_policy()
+    if rng is None: rng = np.random.default_rng()
+    cut = int(DECK_SIZE * decks * penetration)
+    if DECK_SIZE * decks - cut < MAX_ROUND_CARDS:
+        raise ValueError(f"penetration {penetration} leaves fewer than {MAX_ROUND_CARDS} cards behind the cut")
+
+    stats = SimulationStats()
+    for start in range(0, shoes, BATCH_SIZE):
+        n = min(BATCH_SIZE, shoes - start)
+        shoe = ShoeBatch(n, decks, rng)
+        rows = np.arange(n)
+        while len(rows):
+            stats.record(*play_round(shoe, rows, policy))
+            rows = rows[shoe.pos[rows] < cut]
+    return stats
+
+# --- PARALLEL RUNNER ---
+def _simulate_worker(args):
+    shoes, decks, penetration, policy, seed_seq = args
+    return simulate(shoes, decks, penetration, policy, np.random.default_rng(seed_seq))
+
+def simulate_parallel(shoes, decks=DECKS, penetration=PENETRATION, policy=None, seed=0, workers=None):
+    # Splits the shoes evenly across a process pool. Worker i always gets the
+    # i-th child of SeedSequence(seed) and the same share of shoes, so a given
+    # (seed, workers) pair reproduces bit-identical counts.
+    if policy is None: policy = threshold_policy()
+    workers = workers or os.cpu_count() or 1
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    shares = [shoes // workers + (i < shoes % workers) for i in range(workers)]
+    jobs = [(n, decks, penetration, policy, s) for n, s in zip(shares, seeds)]
+    if workers == 1:
+        return _simulate_worker(jobs[0])
+
+    stats = SimulationStats()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(_simulate_worker, jobs):
+            stats = stats + part
+    return stats
+
+def print_report(stats, elapsed):
+    hands = stats.hands
+    print(f"{hands} hands in {elapsed:.2f}s ({hands / max(elapsed, 1e-9):,.0f} hands/s)")
+    for name, count in stats.outcome_totals().items():
+        print(f"  {name:<12} {count:>12} {count / max(hands, 1):8.2%}")
+    print(f"  EV per hand  {stats.ev():+.4f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless Blackjack simulator")
+    parser.add_argument('--shoes', type=int, default=100_000)
+    parser.add_argument('--decks', type=int, default=DECKS)
+    parser.add_argument('--penetration', type=float, default=PENETRATION)
+    parser.add_argument('--stand-on', type=int, default=17, help="player hits below this total")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    seed = args.seed
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+        print(f"seed {seed}")
+    start = time.perf_counter()
+    stats = simulate_parallel(args.shoes, args.decks, args.penetration,
+                              threshold_policy(args.stand_on), seed, args.workers)
+    print_report(stats, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,6 +1,7 @@
 import pygame
 import random
 import sys
+from collections import OrderedDict
 
 # --- Constants ---
 SCREEN_WIDTH, SCREEN_HEIGHT = 800, 600
@@ -39,9 +40,46 @@ def is_valid_move(card, top_card, active_suit):
     if card.rank == top_card.rank: return True
     return False
 
+# --- Text ---
+# pygame.font.SysFont() searches the system font table and loads the font file
+# on every call, which draw_text used to do for every label each frame. The
+# font file is resolved once per (family, bold) at startup, Font objects are
+# kept per (family, size, bold) and rendered labels go through a small LRU
+# cache keyed by (text, size, color).
+FONT_FAMILY = 'Arial'
+TEXT_CACHE_SIZE = 256
+font_files = {}              # (family, bold) -> (path, needs synthetic bold)
+fonts = {}                   # (family, size, bold) -> Font
+text_cache = OrderedDict()   # (text, size, color) -> Surface
+
+def resolve_font(family=FONT_FAMILY, bold=True):
+    # Let SysFont pick the file, but keep the path instead of building a Font
+    key = (family, bold)
+    if key not in font_files:
+        font_files[key] = pygame.font.SysFont(family, 1, bold, constructor=lambda path, size, b, i: (path, b))
+    return font_files[key]
+
+def get_font(size, family=FONT_FAMILY, bold=True):
+    key = (family, size, bold)
+    font = fonts.get(key)
+    if font is None:
+        path, synthetic_bold = resolve_font(family, bold)
+        font = fonts[key] = pygame.font.Font(path, size)
+        font.set_bold(synthetic_bold)
+    return font
+
+def render_text(text, size, color):
+    key = (text, size, tuple(color))
+    img = text_cache.get(key)
+    if img is None:
+        img = text_cache[key] = get_font(size).render(text, True, color)
+        if len(text_cache) > TEXT_CACHE_SIZE: text_cache.popitem(last=False)
+    else:
+        text_cache.move_to_end(key)
+    return img
+
 def draw_text(surface, text, x, y, size=30, color=BLACK):
-    font = pygame.font.SysFont('Arial', size, bold=True)
-    img = font.render(text, True, color)
+    img = render_text(text, size, color)
     surface.blit(img, (x, y))
 
 def draw_card(surface, card, x, y, hidden=False):
@@ -65,6 +103,7 @@ def draw_card(surface, card, x, y, hidden=False):
 def main():
     pygame.init()
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    resolve_font()  # Scan the system fonts now rather than on the first frame
     pygame.display.set_caption("Crazy 8s - Linux (Smooth)")
     clock = pygame.time.Clock()
 
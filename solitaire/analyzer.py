@@ -0,0 +1,98 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from solitaire import SolitaireGame
+from solver import SOLVED, UNSOLVABLE, UNKNOWN, solve
+
+# Batch winnability analysis: deal seeds start..start+deals-1 with
+# SolitaireGame(seed) (the same layout as the GUI), solve each one on a
+# process pool and stream one row per deal to a CSV or JSONL file. Every deal
+# has its own time (and optionally node) budget, so a hard deal ends up as
+# "unknown" instead of holding up the batch.
+
+FIELDS = ['seed', 'solvable', 'status', 'moves', 'nodes', 'seconds']
+IN_FLIGHT_PER_WORKER = 4  # Deals submitted ahead of the results, per worker
+
+def analyze_deal(seed, time_limit=None, max_nodes=None, draw_count=1):
+    result = solve(SolitaireGame(seed, draw_count), max_nodes, time_limit)
+    return {'seed': seed, 'solvable': int(result.solvable), 'status': result.status,
+            'moves': len(result.moves), 'nodes': result.nodes, 'seconds': round(result.elapsed, 4)}
+
+def _analyze_worker(args):
+    return analyze_deal(*args)
+
+def analyze(seeds, time_limit=None, max_nodes=None, workers=None, draw_count=1):
+    # Yields rows in seed order, each as soon as it and every earlier seed are
+    # done. A bounded window of deals is in flight and refilled as each one
+    # finishes, so one slow deal keeps only its own worker busy instead of
+    # holding up a whole batch, and a long range never queues up front.
+    workers = workers or os.cpu_count() or 1
+    jobs = ((seed, time_limit, max_nodes, draw_count) for seed in seeds)
+    if workers == 1:
+        yield from map(_analyze_worker, jobs)
+        return
+    window = workers * IN_FLIGHT_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}  # future -> position in the seed sequence
+        done = {}     # position -> row, for rows finished ahead of their turn
+        submitted = next_out = 0
+        while True:
+            for job in jobs:
+                pending[pool.submit(_analyze_worker, job)] = submitted
+                submitted += 1
+                if len(pending) >= window: break
+            if not pending: return
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished: done[pending.pop(future)] = future.result()
+            while next_out in done:
+                yield done.pop(next_out)
+                next_out += 1
+
+class RowWriter:
+    # CSV or JSONL depending on the file extension; flushed after every row
+    def __init__(self, f, fmt):
+        self.f = f
+        self.fmt = fmt
+        if fmt == 'csv':
+            self.csv = csv.DictWriter(f, fieldnames=FIELDS)
+            self.csv.writeheader()
+
+    def write(self, row):
+        if self.fmt == 'csv': self.csv.writerow(row)
+        else: self.f.write(json.dumps(row) + "\n")
+        self.f.flush()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check which Solitaire deals can be won")
+    parser.add_argument('--start', type=int, default=0, help="first seed")
+    parser.add_argument('--deals', type=int, default=1000)
+    parser.add_argument('--time-limit', type=float, default=5.0, help="seconds per deal")
+    parser.add_argument('--max-nodes', type=int, default=None,
+                        help="node budget per deal (reproducible across machines, unlike --time-limit)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--draw', type=int, choices=(1, 3), default=1, help="cards per stock click")
+    parser.add_argument('--out', default="deals.csv", help="output file, .csv or .jsonl")
+    args = parser.parse_args(argv)
+
+    fmt = 'jsonl' if args.out.endswith(('.jsonl', '.json')) else 'csv'
+    counts = {SOLVED: 0, UNSOLVABLE: 0, UNKNOWN: 0}
+    start = time.perf_counter()
+    with open(args.out, 'w', newline='') as f:
+        writer = RowWriter(f, fmt)
+        seeds = range(args.start, args.start + args.deals)
+        for done, row in enumerate(analyze(seeds, args.time_limit, args.max_nodes, args.workers, args.draw), 1):
+            writer.write(row)
+            counts[row['status']] += 1
+            if done % 100 == 0:
+                print(f"{done}/{args.deals} deals, {done / (time.perf_counter() - start):.1f} deals/s", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+    print(f"{args.deals} deals in {elapsed:.1f}s ({args.deals / max(elapsed, 1e-9):.1f} deals/s): "
+          f"solved {counts[SOLVED]}, unsolvable {counts[UNSOLVABLE]}, unknown {counts[UNKNOWN]}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,110 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+
+# Index of deal seeds the solver has won, for the "winnable deals only" mode.
+# The file is a header (magic and the last seed analyzed, won or not)
+# followed by fixed-size entries (seed, difficulty, solution length), appended
+# in seed order. Difficulty is the number of nodes the solver searched, so it
+# grows with how much backtracking the deal needs. Readers memory-map the file
+# and pick entry i at offset header + i * size, so choosing a deal is O(1) and
+# never runs the solver at launch. Appending whole entries keeps the file
+# valid while `extend` is still running, and the header is rewritten after
+# every deal so the next `extend` resumes after the last seed analyzed rather
+# than the last one won.
+
+INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "deal_index.bin")
+INDEX_PATH_DRAW_THREE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "deal_index_draw3.bin")
+INDEX_MAGIC = b'SIX2'
+LEGACY_MAGIC = b'SIX1'  # Entries right after the magic, no last analyzed seed
+HEADER = struct.Struct('<4sq')  # magic, last seed analyzed (-1 for none)
+ENTRY = struct.Struct('<IIH')  # seed, difficulty, solution moves
+
+class DealIndex:
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self.map = None
+        self.count = 0
+        self.offset = HEADER.size  # Where the entries start
+        self.analyzed = -1         # Last seed analyzed
+        if os.path.exists(path) and os.path.getsize(path) > len(INDEX_MAGIC):
+            with open(path, 'rb') as f:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic = self.map[:len(INDEX_MAGIC)]
+            if magic == LEGACY_MAGIC: self.offset = len(LEGACY_MAGIC)
+            elif magic == INDEX_MAGIC and len(self.map) >= HEADER.size: self.analyzed = HEADER.unpack_from(self.map)[1]
+            else: raise ValueError(f"{path} is not a deal index")
+            self.count = (len(self.map) - self.offset) // ENTRY.size
+            # An entry is written before the header that covers it
+            self.analyzed = max(self.analyzed, self.last_seed())
+
+    def __len__(self):
+        return self.count
+
+    def entry(self, i):
+        # (seed, difficulty, moves)
+        if not 0 <= i < self.count: raise IndexError(i)
+        return ENTRY.unpack_from(self.map, self.offset + i * ENTRY.size)
+
+    def random_entry(self, rng):
+        return self.entry(rng.randrange(self.count)) if self.count else None
+
+    def last_seed(self):
+        return self.entry(self.count - 1)[0] if self.count else -1
+
+    def close(self):
+        if self.map: self.map.close()
+
+def index_path(draw_count=1):
+    return INDEX_PATH_DRAW_THREE if draw_count == 3 else INDEX_PATH
+
+def extend(path, deals, time_limit, workers, draw_count=1, log=print):
+    # Solve the next `deals` seeds after the last analyzed one and append the wins
+    from analyzer import analyze
+    index = DealIndex(path)
+    start = index.analyzed + 1
+    entries = index.map[index.offset:index.offset + index.count * ENTRY.size] if index.map else b''
+    legacy = index.offset != HEADER.size
+    index.close()
+    if legacy or not entries:
+        # Start the file over with a header (keeping any old entries)
+        with open(path, 'wb') as f: f.write(HEADER.pack(INDEX_MAGIC, start - 1) + entries)
+    added = 0
+    with open(path, 'r+b') as f:
+        for row in analyze(range(start, start + deals), time_limit, None, workers, draw_count):
+            if row['solvable']:
+                f.seek(0, os.SEEK_END)
+                f.write(ENTRY.pack(row['seed'], min(row['nodes'], 2**32 - 1), row['moves']))
+                added += 1
+            f.seek(0)
+            f.write(HEADER.pack(INDEX_MAGIC, row['seed']))
+            f.flush()
+    log(f"seeds {start}..{start + deals - 1}: {added} winnable deals added")
+    return added
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect the winnable deal index")
+    parser.add_argument('--draw', type=int, choices=(1, 3), default=1, help="cards per stock click")
+    parser.add_argument('--path', help="index file (default: the one the game uses for --draw)")
+    parser.add_argument('--extend', type=int, default=0, metavar='DEALS', help="solve this many more seeds")
+    parser.add_argument('--time-limit', type=float, default=5.0, help="seconds per deal")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--nice', type=int, default=10, help="lower the priority of the run (POSIX)")
+    args = parser.parse_args(argv)
+    args.path = args.path or index_path(args.draw)
+
+    if args.extend:
+        if args.nice and hasattr(os, 'nice'): os.nice(args.nice)
+        extend(args.path, args.extend, args.time_limit, args.workers, args.draw)
+    index = DealIndex(args.path)
+    if not len(index):
+        print("index is empty")
+        return
+    scores = sorted(index.entry(i)[1] for i in range(len(index)))
+    print(f"{len(index)} winnable deals in seeds 0..{index.analyzed}; "
+          f"difficulty median {scores[len(scores) // 2]}, 90th percentile {scores[len(scores) * 9 // 10]}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,108 @@
+import argparse
+import sys
+import time
+
+from solitaire import (SolitaireGame, TABLEAU_IDS, STOCK_ID, WASTE_ID, DRAW_MOVE, UNDO_BYTE, REDO_BYTE,
+                       RECORD_HEADER, RECORD_MAGIC, RECORD_VERSION, RECORD_WON, RECORD_DRAW_THREE, ARCHIVE_PATH,
+                       game_record)
+from solver import solve
+
+# Game records: a fixed header (see RECORD_HEADER) with the deal seed, then the
+# game log of one or two bytes per move (see SolitaireGame.log). Files are
+# plain concatenations of records, so archiving a game is a single append.
+# Replaying a corpus re-executes every move through SolitaireGame.move_cards()
+# and checks that each game ends won or unfinished as recorded, which makes
+# an archive a regression test for the rules code.
+
+def read_records(data):
+    # Yields (seed, flags, log) for every record in a bytes-like object
+    view = memoryview(data)
+    pos = 0
+    while pos < len(view):
+        magic, version, flags, seed, length = RECORD_HEADER.unpack_from(view, pos)
+        if magic != RECORD_MAGIC or version != RECORD_VERSION:
+            raise ValueError(f"not a game record at byte {pos}")
+        pos += RECORD_HEADER.size
+        yield seed, flags, view[pos:pos + length]
+        pos += length
+
+def replay(seed, log, draw_count=1):
+    # Plays a log back on a fresh deal and returns (game, moves played);
+    # raises ValueError on an illegal move
+    game = SolitaireGame(seed, draw_count)
+    move_cards, pile = game.move_cards, game.pile
+    i, n, moves = 0, len(log), 0
+    while i < n:
+        byte = log[i]
+        i += 1
+        moves += 1
+        if byte == UNDO_BYTE:
+            ok = game.undo()
+        elif byte == REDO_BYTE:
+            ok = game.redo()
+        else:
+            src, dst = byte >> 4, byte & 15
+            if src == STOCK_ID and dst == WASTE_ID:
+                ok = move_cards(*DRAW_MOVE)
+            else:
+                count = 1
+                if src in TABLEAU_IDS and dst in TABLEAU_IDS:
+                    count = log[i]
+                    i += 1
+                ok = move_cards(src, len(pile(src)) - count, dst)
+        if not ok: raise ValueError(f"seed {seed}: illegal move at byte {i - 1}")
+    return game, moves
+
+def solved_records(seeds, time_limit=5.0, draw_count=1):
+    # Records of solver wins, a convenient benchmark corpus
+    for seed in seeds:
+        game = SolitaireGame(seed, draw_count)
+        result = solve(game, time_limit=time_limit)
+        if not result.solvable: continue
+        for move in result.moves: game.move_cards(*move)
+        yield game_record(game)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and replay Solitaire game records")
+    sub = parser.add_subparsers(dest='command', required=True)
+    make = sub.add_parser('make', help="write the solver's wins for a seed range to a file")
+    make.add_argument('out')
+    make.add_argument('--start', type=int, default=0)
+    make.add_argument('--deals', type=int, default=100)
+    make.add_argument('--time-limit', type=float, default=5.0)
+    make.add_argument('--draw', type=int, choices=(1, 3), default=1, help="cards per stock click")
+    play = sub.add_parser('replay', help="replay record files and check their outcomes")
+    play.add_argument('files', nargs='*', default=[ARCHIVE_PATH])
+    args = parser.parse_args(argv)
+
+    if args.command == 'make':
+        with open(args.out, 'wb') as f:
+            count = sum(f.write(record) > 0 for record in
+                        solved_records(range(args.start, args.start + args.deals), args.time_limit, args.draw))
+        print(f"wrote {count} records to {args.out}")
+        return
+
+    games = moves = failures = 0
+    start = time.perf_counter()
+    for path in args.files:
+        with open(path, 'rb') as f:
+            data = f.read()
+        for seed, flags, log in read_records(data):
+            games += 1
+            try:
+                game, played = replay(seed, log, 3 if flags & RECORD_DRAW_THREE else 1)
+                won = game.check_for_win()
+                moves += played
+            except ValueError as e:
+                print(e)
+                failures += 1
+                continue
+            if won != bool(flags & RECORD_WON):
+                print(f"seed {seed}: recorded {'won' if flags & RECORD_WON else 'unfinished'}, replayed {'won' if won else 'unfinished'}")
+                failures += 1
+    elapsed = time.perf_counter() - start
+    print(f"{games} games, {moves} moves in {elapsed:.2f}s ({moves / max(elapsed, 1e-9):,.0f} moves/s), {failures} failures")
+    if failures: sys.exit(1)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,9 +1,14 @@
 import pygame
+import os
 import random
+import struct
 import sys
+from array import array
+from itertools import islice
+
+from deal_index import DealIndex, index_path
 
 # --- SETUP ---
-pygame.init()
 SCREEN_WIDTH, SCREEN_HEIGHT = 1000, 750
 CARD_W, CARD_H = 80, 110
 STACK_OFFSET_Y = 25
@@ -12,6 +17,9 @@ CARD_COLOR = (250, 250, 250)
 BLACK = (0, 0, 0)
 RED = (220, 20, 20)      # Richer Red
 YELLOW = (255, 215, 0)   # Gold for selection highlighting
+HINT_COLOR = (0, 200, 255)
+AUTO_DELAY = 120  # ms between automatic foundation / auto-complete moves
+HINT_TIME = 1500  # ms a hint stays on screen
 
 SUITS = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
 RANKS = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
@@ -174,21 +182,175 @@ class Card:
         self.color = RED if suit in ['Hearts', 'Diamonds'] else BLACK
         self.value = RANKS.index(rank) + 1 
 
+# --- Rules ---
+# Shared by SolitaireGame and the headless tools (solver, replayer)
+def can_stack_tableau(card, target_card):
+    # Build down in alternating colors; only a King may start an empty pile
+    if target_card is None: return card.rank == 'K'
+    if target_card.color == card.color: return False
+    return target_card.value == card.value + 1
+
+def can_stack_foundation(card, top_card):
+    # Build up by suit, starting from the Ace
+    if top_card is None: return card.rank == 'A'
+    if top_card.suit != card.suit: return False
+    return top_card.value == card.value - 1
+
+# Pile ids used by moves: (source pile, card index, target pile)
+TABLEAU_IDS = range(0, 7)
+FOUNDATION_IDS = range(7, 11)
+WASTE_ID = 11
+STOCK_ID = 12
+DRAW_MOVE = (STOCK_ID, -1, WASTE_ID)  # Click on the stock
+
+# --- Stock / Waste ---
+class Talon:
+    # The stock and waste as one list in draw order plus a split point w:
+    # cards[:w] are the waste (top card cards[w - 1]) and cards[w:] the stock
+    # (next card to draw cards[w]). Drawing moves w forward and recycling sets
+    # it back to 0, so neither copies or flips cards: whether a talon card is
+    # face up follows from which side of w it is on. face_up is set when a
+    # card is drawn and is only read once the card leaves the waste.
+    __slots__ = ('cards', 'w')
+
+    def __init__(self, cards):
+        self.cards = cards
+        self.w = 0
+
+class WastePile:
+    # List-like view of the waste side of a Talon, so the waste can be used
+    # like the other piles (len, [i], slicing, append/extend/pop, del [i:])
+    def __init__(self, talon):
+        self.talon = talon
+
+    def __len__(self):
+        return self.talon.w
+
+    def __iter__(self):
+        return islice(self.talon.cards, self.talon.w)
+
+    def __getitem__(self, i):
+        w = self.talon.w
+        if isinstance(i, slice): return self.talon.cards[:w][i]
+        if i < 0: i += w
+        if not 0 <= i < w: raise IndexError(i)
+        return self.talon.cards[i]
+
+    def __delitem__(self, i):
+        # Only the top of the waste is ever removed (del waste[index:])
+        start = i.start if isinstance(i, slice) else i
+        w = self.talon.w
+        if start < 0: start += w
+        del self.talon.cards[start:w]
+        self.talon.w = start
+
+    def append(self, card):
+        self.talon.cards.insert(self.talon.w, card)
+        self.talon.w += 1
+
+    def extend(self, cards):
+        for card in cards: self.append(card)
+
+    def pop(self):
+        self.talon.w -= 1
+        return self.talon.cards.pop(self.talon.w)
+
+class StockPile:
+    # The stock side of a Talon; cards are taken from it only by draw_card()
+    def __init__(self, talon):
+        self.talon = talon
+
+    def __len__(self):
+        return len(self.talon.cards) - self.talon.w
+
+# --- Move Journal ---
+# Undo/redo entries are one 16-bit int per move: source pile (4 bits), target
+# pile (4 bits), cards moved (5 bits), whether the source's new top card was
+# turned up, and whether the move recycled the waste into the stock. A draw
+# is recorded as stock -> waste with the number of cards drawn.
+def pack_delta(src, dst, count, flipped=False, recycled=False):
+    return src | dst << 4 | count << 8 | flipped << 13 | recycled << 14
+
+def unpack_delta(delta):
+    return delta & 15, delta >> 4 & 15, delta >> 8 & 31, bool(delta >> 13 & 1), bool(delta >> 14 & 1)
+
+# --- Game Log ---
+# Every move, undo and redo in play order: one byte (source id << 4 | target
+# id), plus a card count byte for tableau-to-tableau moves. With the deal seed
+# this is the whole game; record.py replays it.
+UNDO_BYTE, REDO_BYTE = 0xF0, 0xF1
+RECORD_MAGIC, RECORD_VERSION = b'SR', 1
+RECORD_HEADER = struct.Struct('<2sBBQI')  # magic, version, flags, seed, log length
+RECORD_WON, RECORD_DRAW_THREE = 1, 2  # flags
+ARCHIVE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "games.sol")
+
+def game_record(game):
+    flags = (RECORD_WON if game.check_for_win() else 0) | (RECORD_DRAW_THREE if game.draw_count == 3 else 0)
+    return RECORD_HEADER.pack(RECORD_MAGIC, RECORD_VERSION, flags, game.seed, len(game.log)) + game.log
+
+# --- Legal Moves ---
+class LegalMoves:
+    # Legal (src, index, dst) moves, kept up to date as piles change. A face-up
+    # run holds one card of each rank, so each (source, target) pair allows at
+    # most one index and the table stores one index or None per pair. A move
+    # touches two piles, so only their rows and columns are recomputed, each
+    # cell scanning at most one face-up run (never the whole tableau).
+    SOURCES = list(TABLEAU_IDS) + [WASTE_ID]
+    TARGETS = list(TABLEAU_IDS) + list(FOUNDATION_IDS)
+
+    def __init__(self, game):
+        self.game = game
+        self.table = {(src, dst): self.find(src, dst) for src in self.SOURCES for dst in self.TARGETS}
+
+    def find(self, src, dst):
+        source = self.game.pile(src)
+        index = len(source) - 1
+        if src == WASTE_ID:  # Only the top card can move
+            return index if index >= 0 and self.game.is_legal_move(src, index, dst) else None
+        while index >= 0 and source[index].face_up:
+            if self.game.is_legal_move(src, index, dst): return index
+            if dst in FOUNDATION_IDS: break  # Only the top card can move
+            index -= 1
+        return None
+
+    def update(self, *pile_ids):
+        for pile_id in pile_ids:
+            if pile_id in self.SOURCES:
+                for dst in self.TARGETS: self.table[pile_id, dst] = self.find(pile_id, dst)
+            if pile_id in self.TARGETS:
+                for src in self.SOURCES: self.table[src, pile_id] = self.find(src, pile_id)
+
+    def to_foundation(self):
+        for src in self.SOURCES:
+            for dst in FOUNDATION_IDS:
+                index = self.table[src, dst]
+                if index is not None: yield (src, index, dst)
+
+    def __iter__(self):
+        for (src, dst), index in self.table.items():
+            if index is not None: yield (src, index, dst)
+
 # --- Game Class ---
 class SolitaireGame:
-    def __init__(self):
+    def __init__(self, seed=None, draw_count=1):
+        # A seed reproduces the same deal (used by the solver and analyzer);
+        # draw_count is 1 or 3 cards per click on the stock
+        self.seed = seed
+        self.draw_count = draw_count
         self.deck = [Card(r, s) for s in SUITS for r in RANKS]
-        random.shuffle(self.deck)
+        (random.Random(seed) if seed is not None else random).shuffle(self.deck)
         self.tableau = [[] for _ in range(7)]
         self.foundation = [[] for _ in range(4)]
-        self.stock = []
-        self.waste = []
-        self.foundation_rects = [None] * 4 
-        self.stock_rect = None
-        self.waste_rect = None
+        self.talon = Talon([])
+        self.stock = StockPile(self.talon)
+        self.waste = WastePile(self.talon)
         self.selected_pile = None
         self.selected_index = -1
+        self.undo_stack = array('H')
+        self.redo_stack = array('H')
+        self.log = bytearray()
         self.deal()
+        self.legal = LegalMoves(self)
 
     def deal(self):
         for i in range(7):
@@ -196,45 +358,213 @@ class SolitaireGame:
                 card = self.deck.pop()
                 card.face_up = (i == j)
                 self.tableau[i].append(card)
-        self.stock = self.deck
+        self.talon.cards = self.deck[::-1]  # Cards were drawn from the end of the deck
 
     def is_valid_tableau_move(self, stack, card_index, target_pile):
-        moving_cards = stack[card_index:]
-        bottom_card = moving_cards[0]
-        if not target_pile: return bottom_card.rank == 'K'
-        target_card = target_pile[-1]
-        if target_card.color == bottom_card.color: return False
-        if target_card.value != bottom_card.value + 1: return False
-        return True
+        bottom_card = stack[card_index]
+        return can_stack_tableau(bottom_card, target_pile[-1] if target_pile else None)
 
     def is_valid_foundation_move(self, card, target_pile):
         if card != self.selected_pile[self.selected_index]: return False
-        if not target_pile: return card.rank == 'A'
-        target_card = target_pile[-1]
-        if target_card.suit != card.suit: return False
-        if target_card.value == card.value - 1: return True
-        return False
+        return can_stack_foundation(card, target_pile[-1] if target_pile else None)
+
+    def pile(self, pile_id):
+        if pile_id in TABLEAU_IDS: return self.tableau[pile_id]
+        if pile_id in FOUNDATION_IDS: return self.foundation[pile_id - 7]
+        return self.waste if pile_id == WASTE_ID else self.stock
+
+    def pile_id(self, pile):
+        for pile_id in range(STOCK_ID + 1):
+            if self.pile(pile_id) is pile: return pile_id
+        return None
+
+    def is_legal_move(self, src, index, dst):
+        # Whether cards from source[index] up can move onto dst (not DRAW_MOVE)
+        if src == dst or src == STOCK_ID or dst in (WASTE_ID, STOCK_ID) or src in FOUNDATION_IDS: return False
+        source, target = self.pile(src), self.pile(dst)
+        if not 0 <= index < len(source) or not source[index].face_up: return False  # Drawn cards are face up
+        if src == WASTE_ID and index != len(source) - 1: return False
+        if dst in FOUNDATION_IDS:
+            if index != len(source) - 1: return False
+            return can_stack_foundation(source[index], target[-1] if target else None)
+        return self.is_valid_tableau_move(source, index, target)
+
+    def move_cards(self, src, index, dst):
+        # Apply a (src, index, dst) move if it is legal; returns True if it was
+        if (src, index, dst) == DRAW_MOVE:
+            self.draw_card()
+            self.log.append(STOCK_ID << 4 | WASTE_ID)
+            return True
+        if not self.is_legal_move(src, index, dst): return False
+        source, target = self.pile(src), self.pile(dst)
+        count = len(source) - index
+        self.log.append(src << 4 | dst)
+        if dst in TABLEAU_IDS and src in TABLEAU_IDS: self.log.append(count)
+        target.extend(source[index:])
+        del source[index:]
+        self.record(pack_delta(src, dst, count, self.flip_top_card(source)))
+        self.legal.update(src, dst)
+        return True
     
     def flip_top_card(self, pile):
         if pile and not pile[-1].face_up:
             pile[-1].face_up = True
+            return True
+        return False
 
     def draw_card(self):
-        if self.stock:
-            card = self.stock.pop()
-            card.face_up = True
-            self.waste.append(card)
-        elif self.waste:
-            self.stock = [c for c in reversed(self.waste)]
-            for c in self.stock: c.face_up = False
-            self.waste = []
+        talon = self.talon
+        if talon.w < len(talon.cards):
+            count = min(self.draw_count, len(talon.cards) - talon.w)
+            for card in islice(talon.cards, talon.w, talon.w + count): card.face_up = True
+            talon.w += count
+            self.record(pack_delta(STOCK_ID, WASTE_ID, count))
+        elif talon.w:
+            self.record(pack_delta(WASTE_ID, STOCK_ID, talon.w, recycled=True))
+            talon.w = 0
+        self.legal.update(WASTE_ID)
+
+    # --- Undo / Redo ---
+    def record(self, delta):
+        self.undo_stack.append(delta)
+        del self.redo_stack[:]
+
+    def undo(self):
+        if not self.undo_stack: return False
+        delta = self.undo_stack.pop()
+        self.log.append(UNDO_BYTE)
+        src, dst, count, flipped, recycled = unpack_delta(delta)
+        source, target = self.pile(src), self.pile(dst)
+        if src == STOCK_ID:
+            self.talon.w -= count  # Undraw
+        elif recycled:
+            self.talon.w = len(self.talon.cards)
+        else:
+            if flipped: source[-1].face_up = False
+            source.extend(target[-count:])
+            del target[-count:]
+        self.redo_stack.append(delta)
+        self.legal.update(src, dst)
+        return True
+
+    def redo(self):
+        if not self.redo_stack: return False
+        delta = self.redo_stack.pop()
+        self.log.append(REDO_BYTE)
+        src, dst, count, flipped, recycled = unpack_delta(delta)
+        source, target = self.pile(src), self.pile(dst)
+        if src == STOCK_ID:
+            self.talon.w += count  # Cards were turned up when first drawn
+        elif recycled:
+            self.talon.w = 0
+        else:
+            target.extend(source[-count:])
+            del source[-count:]
+            if flipped: source[-1].face_up = True
+        self.undo_stack.append(delta)
+        self.legal.update(src, dst)
+        return True
+
+    # --- Hints / Auto Moves ---
+    def move_score(self, move):
+        # How useful a legal move looks: foundation moves, then moves that turn
+        # a card over or empty a column, then waste plays. 0 for moves that only
+        # shuffle cards between equivalent spots.
+        src, index, dst = move
+        if dst in FOUNDATION_IDS: return 4
+        if src == WASTE_ID: return 1
+        source = self.tableau[src]
+        if index > 0 and not source[index - 1].face_up: return 3
+        if index == 0 and self.tableau[dst]: return 2
+        return 0
+
+    def hint(self):
+        best = max(self.legal, key=self.move_score, default=None)
+        if best and self.move_score(best) > 0: return best
+        return DRAW_MOVE if self.stock or self.waste else None
+
+    def is_safe_to_foundation(self, card):
+        # No tableau card can need this one any more: both foundations of the
+        # other color already hold the rank below it (always true for A and 2)
+        if card.value <= 2: return True
+        other = [len(p) for p in self.foundation if p and p[-1].color != card.color]
+        return len(other) == 2 and min(other) >= card.value - 1
+
+    def safe_foundation_move(self):
+        for move in self.legal.to_foundation():
+            if self.is_safe_to_foundation(self.pile(move[0])[move[1]]): return move
+        return None
+
+    def can_auto_complete(self):
+        # In draw three a talon card can stay out of reach, so wait for it to be empty
+        if self.draw_count != 1 and self.talon.cards: return False
+        return not self.check_for_win() and all(c.face_up for pile in self.tableau for c in pile)
+
+    def auto_complete_move(self):
+        # With every tableau card face up the lowest remaining card can always
+        # go up, so this plays foundation moves and draws until the game is won
+        for move in self.legal.to_foundation(): return move
+        return DRAW_MOVE if self.stock or self.waste else None
 
     def check_for_win(self):
         return all(len(p) == 13 for p in self.foundation)
 
+# --- Layout ---
+# Pile positions are pure arithmetic, shared by drawing and hit-testing, so a
+# click can be mapped to (pile id, card index) without any render pass.
+MARGIN = 20
+PILE_STEP = CARD_W + 10
+TOP_ROW_Y = 20
+TABLEAU_Y = CARD_H + 40
+FOUNDATION_X = SCREEN_WIDTH - MARGIN - 4 * PILE_STEP
+DROP_SLACK = STACK_OFFSET_Y * 2  # Extra room below a column when dropping cards on it
+WASTE_FAN = 20  # Horizontal offset between the fanned waste cards in Draw 3
+
+def pile_position(pile_id):
+    # Top-left corner of a pile (of its first card, for the tableau)
+    if pile_id in TABLEAU_IDS: return MARGIN + pile_id * PILE_STEP, TABLEAU_Y
+    if pile_id in FOUNDATION_IDS: return FOUNDATION_X + (pile_id - 7) * PILE_STEP, TOP_ROW_Y
+    if pile_id == WASTE_ID: return MARGIN + PILE_STEP, TOP_ROW_Y
+    return MARGIN, TOP_ROW_Y
+
+def waste_fan(game):
+    # Up to draw_count waste cards are shown, fanned to the right
+    return max(min(game.draw_count, len(game.waste)) - 1, 0) * WASTE_FAN
+
+def card_rect(game, pile_id, index):
+    x, y = pile_position(pile_id)
+    if pile_id in TABLEAU_IDS: y += max(index, 0) * STACK_OFFSET_Y
+    if pile_id == WASTE_ID: x += waste_fan(game)
+    return pygame.Rect(x, y, CARD_W, CARD_H)
+
+def hit_test(game, pos, slack=0):
+    # Returns (pile id, card index) under pos, with index -1 for an empty
+    # pile's outline, or None. Piles other than the tableau only expose their
+    # top card. slack extends the bottom of tableau columns.
+    x, y = pos
+    if TOP_ROW_Y <= y < TOP_ROW_Y + CARD_H:
+        waste_x = pile_position(WASTE_ID)[0]
+        if waste_x <= x < waste_x + CARD_W + waste_fan(game):
+            return WASTE_ID, len(game.waste) - 1
+        if x >= FOUNDATION_X:
+            slot, dx = divmod(x - FOUNDATION_X, PILE_STEP)
+            pile_id = FOUNDATION_IDS[slot] if slot < len(FOUNDATION_IDS) else None
+        else:
+            slot, dx = divmod(x - MARGIN, PILE_STEP)
+            pile_id = (STOCK_ID, WASTE_ID)[slot] if 0 <= slot < 2 else None
+        if pile_id is None or dx >= CARD_W: return None
+        return pile_id, len(game.pile(pile_id)) - 1
+    col, dx = divmod(x - MARGIN, PILE_STEP)
+    if x < MARGIN or dx >= CARD_W or col not in TABLEAU_IDS or y < TABLEAU_Y: return None
+    pile = game.tableau[col]
+    dy = y - TABLEAU_Y
+    bottom = max(len(pile) - 1, 0) * STACK_OFFSET_Y + CARD_H + slack
+    if dy >= bottom: return None
+    return col, min(dy // STACK_OFFSET_Y, len(pile) - 1)
+
 # --- Drawing Helpers ---
-def draw_card_fancy(screen, card, x, y, is_selected=False):
-    rect = pygame.Rect(x, y, CARD_W, CARD_H)
+def render_card(card, is_selected=False):
+    # Vector rasterization of one card, used to build the card atlas
     card_surface = pygame.Surface((CARD_W, CARD_H))
     card_surface.set_colorkey((0, 255, 0)) # Chroma key
     card_surface.fill(BG_COLOR) # Transparent fill
@@ -274,131 +604,315 @@ def draw_card_fancy(screen, card, x, y, is_selected=False):
             for px, py in positions:
                 draw_suit_icon(card_surface, card.suit, int(px * CARD_W), int(py * CARD_H) + 5, pip_size, card.color)
 
-    screen.blit(card_surface, rect)
-    return rect
+    return card_surface
+
+# --- CARD ATLAS ---
+# All 52 faces and the back, plain and selected, are rendered once into one
+# Surface the first time a card is drawn; draw_card_fancy() then blits
+# subsurfaces of it. Rows: one per suit (plain), one per suit (selected),
+# then the plain and selected backs.
+card_atlas = {}
+
+def get_card_atlas():
+    if not card_atlas:
+        atlas = pygame.Surface((len(RANKS) * CARD_W, (2 * len(SUITS) + 1) * CARD_H))
+        if pygame.display.get_surface(): atlas = atlas.convert()
+        for selected in (False, True):
+            for s_idx, suit in enumerate(SUITS):
+                y = (selected * len(SUITS) + s_idx) * CARD_H
+                for r_idx, rank in enumerate(RANKS):
+                    x = r_idx * CARD_W
+                    atlas.blit(render_card(Card(rank, suit, face_up=True), selected), (x, y))
+                    card_atlas[(rank, suit, selected)] = atlas.subsurface((x, y, CARD_W, CARD_H))
+            x, y = selected * CARD_W, 2 * len(SUITS) * CARD_H
+            atlas.blit(render_card(Card('A', 'Hearts'), selected), (x, y))
+            card_atlas[('BACK', selected)] = atlas.subsurface((x, y, CARD_W, CARD_H))
+    return card_atlas
+
+def draw_card_fancy(screen, card, x, y, is_selected=False):
+    atlas = get_card_atlas()
+    key = (card.rank, card.suit, is_selected) if card.face_up else ('BACK', is_selected)
+    screen.blit(atlas[key], (x, y))
+    return pygame.Rect(x, y, CARD_W, CARD_H)
 
-def draw_tableau(screen, game, selected_stack=None):
+# hidden: cards in flight, drawn by TableView on top instead of in their pile
+def draw_tableau(screen, game, selected_stack=None, hidden=()):
     for i, pile in enumerate(game.tableau):
-        x = 20 + i * (CARD_W + 10)
-        y = CARD_H + 40
+        x, y = pile_position(i)
         if not pile:
             pygame.draw.rect(screen, (0, 60, 0), (x, y, CARD_W, CARD_H), 2, border_radius=6)
         for j, card in enumerate(pile):
+            if card in hidden: continue
             is_selected = (selected_stack == game.tableau[i] and j >= game.selected_index)
-            rect = draw_card_fancy(screen, card, x, y + j * STACK_OFFSET_Y, is_selected)
-            card.rect = rect
+            draw_card_fancy(screen, card, x, y + j * STACK_OFFSET_Y, is_selected)
 
-def draw_foundation_and_stock(screen, game):
+def draw_foundation_and_stock(screen, game, hidden=()):
     for i in range(4):
-        x = SCREEN_WIDTH - 20 - (4 - i) * (CARD_W + 10)
-        y = 20
-        rect = pygame.Rect(x, y, CARD_W, CARD_H)
-        pygame.draw.rect(screen, (0, 60, 0), rect, 2, border_radius=6)
-        game.foundation_rects[i] = rect
-        if game.foundation[i]:
-            card = game.foundation[i][-1]
-            rect = draw_card_fancy(screen, card, x, y)
-            card.rect = rect
+        x, y = pile_position(FOUNDATION_IDS[i])
+        pygame.draw.rect(screen, (0, 60, 0), (x, y, CARD_W, CARD_H), 2, border_radius=6)
+        for card in reversed(game.foundation[i]):
+            if card in hidden: continue
+            draw_card_fancy(screen, card, x, y)
+            break
             
-    x_stock = 20
-    y_stock = 20
-    game.stock_rect = pygame.Rect(x_stock, y_stock, CARD_W, CARD_H)
+    x_stock, y_stock = pile_position(STOCK_ID)
     if game.stock:
         # Use a dummy card face_up=False to draw the back
         card = Card("A", "Hearts", face_up=False) 
         draw_card_fancy(screen, card, x_stock, y_stock)
     else:
-        pygame.draw.rect(screen, (0, 60, 0), game.stock_rect, 2, border_radius=6)
+        pygame.draw.rect(screen, (0, 60, 0), (x_stock, y_stock, CARD_W, CARD_H), 2, border_radius=6)
 
-    x_waste = x_stock + CARD_W + 10
-    y_waste = 20
-    game.waste_rect = pygame.Rect(x_waste, y_waste, CARD_W, CARD_H)
+    x_waste, y_waste = pile_position(WASTE_ID)
     if game.waste:
-        card = game.waste[-1]
-        rect = draw_card_fancy(screen, card, x_waste, y_waste, game.waste == game.selected_pile)
-        card.rect = rect
+        shown = min(game.draw_count, len(game.waste))
+        for i in range(shown):
+            card = game.waste[len(game.waste) - shown + i]
+            if card in hidden: continue
+            is_top = i == shown - 1
+            draw_card_fancy(screen, card, x_waste + i * WASTE_FAN, y_waste, is_top and game.waste is game.selected_pile)
     else:
-        pygame.draw.rect(screen, (0, 60, 0), game.waste_rect, 2, border_radius=6)
+        pygame.draw.rect(screen, (0, 60, 0), (x_waste, y_waste, CARD_W, CARD_H), 2, border_radius=6)
+
+def draw_hint(screen, game, move):
+    src, index, dst = move
+    if move == DRAW_MOVE:
+        pygame.draw.rect(screen, HINT_COLOR, card_rect(game, STOCK_ID, 0), 3, border_radius=6)
+        return
+    pygame.draw.rect(screen, HINT_COLOR, card_rect(game, src, index), 3, border_radius=6)
+    pygame.draw.rect(screen, HINT_COLOR, card_rect(game, dst, len(game.pile(dst)) - 1), 3, border_radius=6)
+
+def card_positions(game):
+    # Screen position of every card that is currently visible
+    positions = {}
+    for i, pile in enumerate(game.tableau):
+        x, y = pile_position(i)
+        for j, card in enumerate(pile): positions[card] = (x, y + j * STACK_OFFSET_Y)
+    for i, pile in enumerate(game.foundation):
+        if pile: positions[pile[-1]] = pile_position(FOUNDATION_IDS[i])
+    x, y = pile_position(WASTE_ID)
+    shown = min(game.draw_count, len(game.waste))
+    for i in range(shown): positions[game.waste[len(game.waste) - shown + i]] = (x + i * WASTE_FAN, y)
+    return positions
+
+# --- Animation ---
+ANIM_TIME = 180          # ms for a card to reach its new pile
+CASCADE_INTERVAL = 70    # ms between cards leaving the foundations on a win
+CASCADE_GRAVITY = 0.5    # px per frame^2 (at 60 FPS)
+CASCADE_BOUNCE = 0.75    # Fraction of speed kept when a card hits the bottom
+FPS = 60
+FRAME_MS = 1000 / FPS
+
+class TableView:
+    # Renders the table from a cached static layer: the piles are drawn into
+    # it only when the game or the selection changes (mark_dirty), and every
+    # frame is one blit of the layer plus one atlas blit per moving card.
+    # Cards in flight are left out of the layer and drawn at their
+    # interpolated position instead.
+    def __init__(self, screen):
+        self.layer = pygame.Surface(screen.get_size()).convert()
+        self.flights = {}  # card -> (start pos, end pos, start time)
+        self.dirty = True
+        self.cascade = None
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def reset(self):
+        self.flights.clear()
+        self.cascade = None
+        self.dirty = True
+
+    def play(self, game, action, now):
+        # Run a game action (a move, undo or redo) and animate every visible
+        # card it moved. Cards drawn from the stock fly out of the stock.
+        before = card_positions(game)
+        for card, flight in self.flights.items():
+            before[card] = self.flight_position(flight, now)  # Redirect cards mid-flight
+        w = game.talon.w
+        done = action()
+        if not done: return done
+        self.cascade = None  # An undo after a win goes back to the table
+        drawn = set(game.talon.cards[w:game.talon.w])
+        for card, end in card_positions(game).items():
+            start = pile_position(STOCK_ID) if card in drawn else before.get(card)
+            if start and start != end: self.flights[card] = (start, end, now)
+        self.dirty = True
+        return done
+
+    def flight_position(self, flight, now):
+        (x0, y0), (x1, y1), t0 = flight
+        t = min((now - t0) / ANIM_TIME, 1.0)
+        t = 1 - (1 - t) ** 3  # Ease out
+        return round(x0 + (x1 - x0) * t), round(y0 + (y1 - y0) * t)
+
+    def busy(self):
+        return bool(self.flights)
+
+    # --- Win cascade ---
+    def start_cascade(self, game):
+        # Cards leave the foundations one by one, bouncing along the bottom
+        # and leaving a trail, like the classic win screen. The trail is drawn
+        # into the layer itself, which is not cleared while it runs.
+        self.render(game)
+        self.cascade = {'stacks': [list(pile) for pile in game.foundation], 'cards': [], 'next': 0, 'launched': 0}
+
+    def update_cascade(self, now, dt):
+        cascade = self.cascade
+        stacks = cascade['stacks']
+        if now >= cascade['next'] and any(stacks):
+            # Take the top card of the next non-empty foundation, right to left
+            i = 3 - cascade['launched'] % 4
+            while not stacks[i]: i = (i - 1) % 4
+            card = stacks[i].pop()
+            x, y = pile_position(FOUNDATION_IDS[i])
+            pygame.draw.rect(self.layer, BG_COLOR, (x, y, CARD_W, CARD_H))
+            pygame.draw.rect(self.layer, (0, 60, 0), (x, y, CARD_W, CARD_H), 2, border_radius=6)
+            if stacks[i]: draw_card_fancy(self.layer, stacks[i][-1], x, y)
+            vx = random.choice((-1, 1)) * random.uniform(2, 6)
+            cascade['cards'].append([card, float(x), float(y), vx, -random.uniform(0, 8)])
+            cascade['launched'] += 1
+            cascade['next'] = now + CASCADE_INTERVAL
+        floor = SCREEN_HEIGHT - CARD_H
+        alive = []
+        for flying in cascade['cards']:
+            card, x, y, vx, vy = flying
+            vy += CASCADE_GRAVITY * dt
+            x += vx * dt
+            y += vy * dt
+            if y > floor:
+                y = floor
+                vy = -vy * CASCADE_BOUNCE
+            flying[1:] = [x, y, vx, vy]
+            draw_card_fancy(self.layer, card, int(x), int(y))
+            if -CARD_W < x < SCREEN_WIDTH: alive.append(flying)
+        cascade['cards'] = alive
+
+    # --- Frame ---
+    def render(self, game):
+        self.layer.fill(BG_COLOR)
+        draw_foundation_and_stock(self.layer, game, self.flights)
+        draw_tableau(self.layer, game, game.selected_pile, self.flights)
+        self.dirty = False
+
+    def draw(self, screen, game, now, dt):
+        if self.cascade:
+            self.update_cascade(now, dt)
+        else:
+            landed = [card for card, flight in self.flights.items() if now - flight[2] >= ANIM_TIME]
+            for card in landed: del self.flights[card]
+            if landed or self.dirty: self.render(game)
+        screen.blit(self.layer, (0, 0))
+        for card, flight in self.flights.items():
+            draw_card_fancy(screen, card, *self.flight_position(flight, now))
 
 # --- Main Loop ---
+def new_game(deal_index=None, draw_count=1):
+    # A seed from the winnable deal index when one is given and not empty,
+    # otherwise a random one
+    entry = deal_index.random_entry(random) if deal_index else None
+    game = SolitaireGame(entry[0] if entry else random.getrandbits(32), draw_count)
+    title = f"Solitaire Deluxe - Python - Draw {draw_count} - Deal {game.seed}"
+    if entry: title += f" (winnable, difficulty {entry[1]})"
+    pygame.display.set_caption(title)
+    return game
+
+def archive_game(game):
+    # Append the game (seed + moves) to the archive read by record.py
+    if game.log:
+        with open(ARCHIVE_PATH, 'ab') as f: f.write(game_record(game))
+
 def main():
+    pygame.init()
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    pygame.display.set_caption("Solitaire Deluxe - Python")
     clock = pygame.time.Clock()
-    game = SolitaireGame()
+    view = TableView(screen)
+    dt = 1.0  # Frame time in 60 FPS frames, for the win cascade physics
+    draw_count = 3 if '--draw3' in sys.argv[1:] else 1
+    deal_indexes = {n: DealIndex(index_path(n)) for n in (1, 3)}  # Winnable seeds per draw mode
+    winnable_only = '--winnable' in sys.argv[1:] and len(deal_indexes[draw_count]) > 0
+    game = new_game(deal_indexes[draw_count] if winnable_only else None, draw_count)
+    auto_foundation = True  # Send safe cards to the foundation after each move
+    auto_pending = False    # A player move happened; look for automatic moves
+    auto_timer = 0          # Timestamp for the next automatic move
+    hint, hint_until = None, 0
 
     while True:
+        current_time = pygame.time.get_ticks()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                archive_game(game)
                 pygame.quit(); sys.exit()
             
+            if event.type == pygame.KEYDOWN:
+                if event.key in (pygame.K_u, pygame.K_r):
+                    view.play(game, game.undo if event.key == pygame.K_u else game.redo, current_time)
+                    game.selected_pile = None
+                    game.selected_index = -1
+                    auto_pending = False  # Don't replay the moves just taken back
+                elif event.key == pygame.K_h:
+                    hint, hint_until = game.hint(), current_time + HINT_TIME
+                elif event.key == pygame.K_a:
+                    auto_foundation = not auto_foundation
+                    auto_pending = auto_foundation
+                elif event.key in (pygame.K_n, pygame.K_w, pygame.K_3):
+                    # W switches "winnable deals only" (needs a deal index for the
+                    # draw mode), 3 switches Draw 1 / Draw 3; both deal again
+                    if event.key == pygame.K_3: draw_count = 4 - draw_count
+                    if event.key == pygame.K_w: winnable_only = not winnable_only
+                    winnable_only = winnable_only and len(deal_indexes[draw_count]) > 0
+                    archive_game(game)
+                    game = new_game(deal_indexes[draw_count] if winnable_only else None, draw_count)
+                    auto_pending, hint = False, None
+                    view.reset()
+
             if event.type == pygame.MOUSEBUTTONDOWN:
-                pos = event.pos
-                
+                hint = None
+                view.mark_dirty()  # The selection changes
                 if game.selected_pile:
-                    for target_index, target_pile in enumerate(game.tableau):
-                        target_x = 20 + target_index * (CARD_W + 10)
-                        target_y = CARD_H + 40
-                        if not target_pile:
-                            target_rect = pygame.Rect(target_x, target_y, CARD_W, CARD_H)
-                        else:
-                            target_rect = pygame.Rect(target_x, target_y + (len(target_pile)-1) * STACK_OFFSET_Y, CARD_W, CARD_H + STACK_OFFSET_Y * 2)
-
-                        if target_rect.collidepoint(pos):
-                            if game.is_valid_tableau_move(game.selected_pile, game.selected_index, target_pile):
-                                moving_cards = game.selected_pile[game.selected_index:]
-                                target_pile.extend(moving_cards)
-                                del game.selected_pile[game.selected_index:]
-                                game.flip_top_card(game.selected_pile)
-                                game.selected_pile = None
-                                game.selected_index = -1
-                                break
-                    
-                    if game.selected_pile is not None and game.selected_index == len(game.selected_pile) - 1:
-                        for i, target_pile in enumerate(game.foundation):
-                            if game.foundation_rects[i].collidepoint(pos):
-                                if game.is_valid_foundation_move(game.selected_pile[-1], target_pile):
-                                    card = game.selected_pile.pop()
-                                    target_pile.append(card)
-                                    game.flip_top_card(game.selected_pile)
-                                    game.selected_pile = None
-                                    game.selected_index = -1
-                                    break
-                    
-                    if game.selected_pile is not None:
-                        game.selected_pile = None
-                        game.selected_index = -1
+                    # Drop the selection on the pile under the cursor, if legal
+                    hit = hit_test(game, event.pos, DROP_SLACK)
+                    move = (game.pile_id(game.selected_pile), game.selected_index, hit[0]) if hit else None
+                    if move and view.play(game, lambda: game.move_cards(*move), current_time):
+                        auto_pending, auto_timer = True, current_time + AUTO_DELAY
+                    game.selected_pile = None
+                    game.selected_index = -1
                 
                 else: 
-                    if game.stock_rect.collidepoint(pos):
-                        game.draw_card()
-                        continue
-                    
-                    for pile in game.tableau:
-                        if not pile: continue
-                        for i in range(len(pile) - 1, -1, -1):
-                            card = pile[i]
-                            if card.face_up and card.rect.collidepoint(pos):
-                                game.selected_pile = pile
-                                game.selected_index = i
-                                break
-                        if game.selected_pile: break
-                    
-                    if not game.selected_pile and game.waste and game.waste_rect.collidepoint(pos):
-                        game.selected_pile = game.waste
-                        game.selected_index = len(game.waste) - 1
-
-        screen.fill(BG_COLOR)
-        selected_stack = game.selected_pile
-        draw_foundation_and_stock(screen, game)
-        draw_tableau(screen, game, selected_stack)
-        
-        if game.check_for_win():
-             # (Placeholder: A pixel-art win message could be added here)
-             pass
+                    hit = hit_test(game, event.pos)
+                    if not hit: continue
+                    pile_id, index = hit
+                    if pile_id == STOCK_ID:
+                        view.play(game, lambda: game.move_cards(*DRAW_MOVE), current_time)
+                        auto_pending, auto_timer = True, current_time + AUTO_DELAY
+                    elif (pile_id in TABLEAU_IDS or pile_id == WASTE_ID) and index >= 0 and game.pile(pile_id)[index].face_up:
+                        game.selected_pile = game.pile(pile_id)
+                        game.selected_index = index
+
+        # Automatic moves, one per AUTO_DELAY: finish the game once every
+        # tableau card is face up, otherwise send safe cards up
+        if auto_pending and not game.selected_pile and current_time >= auto_timer:
+            move = None
+            if game.can_auto_complete():
+                move = game.auto_complete_move()
+            elif auto_foundation:
+                move = game.safe_foundation_move()
+            if move:
+                view.play(game, lambda: game.move_cards(*move), current_time)
+                auto_timer = current_time + AUTO_DELAY
+            else:
+                auto_pending = False
+
+        # Once the last card has landed, send the foundations cascading
+        if not view.cascade and not view.busy() and game.check_for_win():
+            view.start_cascade(game)
+
+        view.draw(screen, game, current_time, dt)
+        if hint and current_time < hint_until:
+            draw_hint(screen, game, hint)
 
         pygame.display.flip()
-        clock.tick(30)
+        dt = clock.tick(FPS) / FRAME_MS
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,358 @@
+import argparse
+import sys
+import time
+
+from solitaire import (SUITS, RANKS, Card, SolitaireGame, can_stack_tableau, can_stack_foundation,
+                       WASTE_ID, DRAW_MOVE)
+
+# Klondike solver for SolitaireGame deals, with the GUI's rules: Draw 1 or 3,
+# unlimited passes through the stock, and no moves back off the foundations.
+# It can see the face-down cards, so it answers "can this deal be won?".
+#
+# The search is a depth-first search over a mutable state with do/undo and a
+# transposition table. States are canonicalized before hashing: the tableau
+# columns are sorted (their order never matters) and the stock and waste are
+# one sequence, the same Talon layout as the game. A talon move stands for
+# "draw until this card is on top, then play it" and is expanded into stock
+# clicks only when the solution is returned. In Draw 1 every talon card can be
+# reached that way, so the draw position is left out of the key; in Draw 3
+# only every third card (and the last) can, so it is kept.
+#
+# The search first runs with two heuristic prunings (see moves()) that make
+# most deals fast but can skip a move a win needs. Running out of moves there
+# proves nothing, so before a deal is called unsolvable the search is repeated
+# without them in what is left of the budget. Only that exhaustive search
+# reports UNSOLVABLE; if it runs out of budget the deal is UNKNOWN.
+
+# --- CARD ENCODING ---
+# card id = suit index * 13 + rank index (A=0 .. K=12)
+def card_id(card):
+    return SUITS.index(card.suit) * 13 + RANKS.index(card.rank)
+
+def _build_rule_tables():
+    # Lookup tables built from the game's own rule functions
+    cards = [Card(RANKS[c % 13], SUITS[c // 13], face_up=True) for c in range(52)]
+    stacks_on = [[can_stack_tableau(cards[c], cards[t]) for t in range(52)] for c in range(52)]
+    starts_pile = [can_stack_tableau(cards[c], None) for c in range(52)]
+    # Whether c may go on a foundation holding exactly the cards below it
+    follows = [can_stack_foundation(cards[c], cards[c - 1] if c % 13 else None) for c in range(52)]
+    return stacks_on, starts_pile, follows
+
+STACKS_ON, STARTS_PILE, FOUNDATION_NEXT = _build_rule_tables()
+IS_RED = [c // 13 < 2 for c in range(52)]
+
+SOLVED, UNSOLVABLE, UNKNOWN = "solved", "unsolvable", "unknown"
+CHECK_EVERY = 1024  # Nodes between time budget checks
+
+class SolveResult:
+    def __init__(self, status, moves, nodes, elapsed):
+        self.status = status
+        self.moves = moves  # GUI moves (src, index, dst), see SolitaireGame.move_cards
+        self.nodes = nodes
+        self.elapsed = elapsed
+
+    @property
+    def solvable(self):
+        return self.status == SOLVED
+
+class _OutOfBudget(Exception):
+    pass
+
+class KlondikeSolver:
+    # Internal moves: ('tf', col) tableau to foundation, ('tt', col, index, col)
+    # tableau to tableau, ('wf', k) and ('wt', k, col) talon card k to the
+    # foundation / a column.
+    def __init__(self, game, max_nodes=None, time_limit=None, prune=True):
+        self.piles = [[card_id(c) for c in pile] for pile in game.tableau]
+        self.down = [sum(1 for c in pile if not c.face_up) for pile in game.tableau]
+        # Foundation slots keep their suit so moves map back onto the GUI piles
+        self.slot_suit = [card_id(p[0]) // 13 if p else -1 for p in game.foundation]
+        self.found = [0] * 4  # Cards on the foundation, per suit
+        for slot, pile in enumerate(game.foundation):
+            if pile: self.found[self.slot_suit[slot]] = len(pile)
+        # Talon: waste bottom..top, then the stock in draw order. The first
+        # w cards are the waste.
+        self.talon = [card_id(c) for c in game.talon.cards]
+        self.w = game.talon.w
+        self.draw = game.draw_count
+
+        self.prune = prune
+        self.max_nodes = max_nodes
+        self.deadline = time.perf_counter() + time_limit if time_limit else None
+        self.nodes = 0
+        self.seen = set()
+        self.path = []
+
+    # --- STATE ---
+    def key(self):
+        cols = sorted((self.down[i],) + tuple(self.piles[i]) for i in range(7))
+        if self.draw == 1: return (tuple(cols), tuple(self.found), tuple(self.talon))
+        return (tuple(cols), tuple(self.found), tuple(self.talon), self.w)
+
+    def is_won(self):
+        return sum(self.found) == 52
+
+    def can_found(self, c):
+        return self.found[c // 13] == c % 13 and FOUNDATION_NEXT[c]
+
+    def is_safe(self, c):
+        # c is never needed in the tableau again once both opposite-colored
+        # cards one rank lower are on the foundations (always true for A and 2)
+        r = c % 13
+        if r <= 1: return True
+        opp = (2, 3) if IS_RED[c] else (0, 1)
+        return self.found[opp[0]] >= r and self.found[opp[1]] >= r
+
+    def talon_draws(self, k):
+        # Stock clicks that bring talon[k] to the top of the waste, counting
+        # a recycle as one click; None if it cannot get there
+        top, n, length = k + 1, self.draw, len(self.talon)
+        def forward(w):
+            if top < w: return None
+            if (top - w) % n and top != length: return None
+            return -(-(top - w) // n)
+        clicks = forward(self.w)
+        if clicks is not None: return clicks
+        clicks = forward(0)
+        if clicks is None: return None
+        return -(-(length - self.w) // n) + 1 + clicks
+
+    def reachable_talon(self):
+        if self.draw == 1: return enumerate(self.talon)
+        return ((k, c) for k, c in enumerate(self.talon) if self.talon_draws(k) is not None)
+
+    # --- MOVES ---
+    def safe_move(self):
+        for i in range(7):
+            pile = self.piles[i]
+            if pile and self.can_found(pile[-1]) and self.is_safe(pile[-1]): return ('tf', i)
+        # A talon card is only forced when it is on top of the waste (or in
+        # Draw 1, where w is not part of the state): drawing to a deeper one
+        # changes which cards the Draw 3 alignment reaches, so moves() branches
+        # on those instead
+        for k, c in self.reachable_talon():
+            if self.can_found(c) and self.is_safe(c) and (self.draw == 1 or self.talon_draws(k) == 0):
+                return ('wf', k)
+        return None
+
+    def moves(self):
+        # Ordered: foundation moves, moves that turn over a card or empty a
+        # column (deepest columns first), talon moves, then the remaining
+        # tableau moves.
+        # With self.prune, two kinds of move are skipped: emptying a column
+        # while no King in the talon or face up could use it, and splitting a
+        # built sequence unless that frees a card for the foundation. Both
+        # are usually useless but not always (a face-down King may want the
+        # column later; a split can let a talon card take the freed spot), so
+        # a pruned search is a heuristic, never a proof.
+        found_moves, reveals, talon_moves, others = [], [], [], []
+        piles, down, prune = self.piles, self.down, self.prune
+        king_waiting = not prune or any(c % 13 == 12 for c in self.talon) or any(
+            pile[idx] % 13 == 12 for pile, d in zip(piles, down) for idx in range(max(d, 1), len(pile)))
+        for i in sorted(range(7), key=lambda i: -down[i]):
+            pile = piles[i]
+            if not pile: continue
+            if self.can_found(pile[-1]):
+                found_moves.append(('tf', i))
+            for idx in range(down[i], len(pile)):
+                c = pile[idx]
+                if idx == down[i]:
+                    if idx == 0 and not king_waiting: continue
+                    group = reveals
+                elif not prune or self.can_found(pile[idx - 1]):
+                    group = others
+                else:
+                    continue
+                empty_done = False
+                for j in range(7):
+                    if j == i: continue
+                    target = piles[j]
+                    if target:
+                        if not STACKS_ON[c][target[-1]]: continue
+                    else:
+                        # All empty columns are equivalent, and moving a whole
+                        # column into one changes nothing
+                        if empty_done or idx == 0 or not STARTS_PILE[c]: continue
+                        empty_done = True
+                    group.append(('tt', i, idx, j))
+        for k, c in self.reachable_talon():
+            if self.can_found(c):
+                found_moves.append(('wf', k))
+            empty_done = False
+            for j in range(7):
+                target = piles[j]
+                if target:
+                    if not STACKS_ON[c][target[-1]]: continue
+                else:
+                    if empty_done or not STARTS_PILE[c]: continue
+                    empty_done = True
+                talon_moves.append(('wt', k, j))
+        return found_moves + reveals + talon_moves + others
+
+    def apply(self, move):
+        # Returns what undo() needs: (move, card or cards moved, flipped, old w)
+        kind = move[0]
+        piles = self.piles
+        if kind == 'tf':
+            i = move[1]
+            c = piles[i].pop()
+            self._found_push(c)
+            return (move, c, self._flip(i), None)
+        if kind == 'tt':
+            _, i, idx, j = move
+            count = len(piles[i]) - idx
+            piles[j].extend(piles[i][idx:])
+            del piles[i][idx:]
+            return (move, count, self._flip(i), None)
+        k = move[1]
+        c = self.talon.pop(k)
+        old_w, self.w = self.w, k
+        if kind == 'wf': self._found_push(c)
+        else: piles[move[2]].append(c)
+        return (move, c, False, old_w)
+
+    def undo(self, record):
+        move, c, flipped, old_w = record
+        kind = move[0]
+        piles = self.piles
+        if flipped: self.down[move[1]] += 1
+        if kind == 'tf':
+            self._found_pop(c)
+            piles[move[1]].append(c)
+        elif kind == 'tt':
+            i, j = move[1], move[3]
+            start = len(piles[j]) - c
+            piles[i].extend(piles[j][start:])
+            del piles[j][start:]
+        else:
+            if kind == 'wf': self._found_pop(c)
+            else: piles[move[2]].pop()
+            self.talon.insert(move[1], c)
+            self.w = old_w
+
+    def _flip(self, i):
+        if self.piles[i] and self.down[i] == len(self.piles[i]):
+            self.down[i] -= 1
+            return True
+        return False
+
+    def _found_push(self, c):
+        s = c // 13
+        if self.found[s] == 0: self.slot_suit[self.slot_suit.index(-1)] = s
+        self.found[s] += 1
+
+    def _found_pop(self, c):
+        s = c // 13
+        self.found[s] -= 1
+        if self.found[s] == 0: self.slot_suit[self.slot_suit.index(s)] = -1
+
+    # --- SEARCH ---
+    def search(self):
+        applied = []
+        try:
+            # Safe foundation moves never hurt, so they are not branched on
+            move = self.safe_move()
+            while move:
+                applied.append(self.apply(move))
+                move = self.safe_move()
+            if self.is_won():
+                self.path.extend(applied)
+                return True
+            key = self.key()
+            if key in self.seen: return False
+            self.seen.add(key)
+
+            self.nodes += 1
+            if self.nodes % CHECK_EVERY == 0:
+                if self.max_nodes and self.nodes >= self.max_nodes: raise _OutOfBudget()
+                if self.deadline and time.perf_counter() > self.deadline: raise _OutOfBudget()
+
+            for move in self.moves():
+                record = self.apply(move)
+                if self.search():
+                    self.path[:0] = applied + [record]
+                    return True
+                self.undo(record)
+            return False
+        finally:
+            if not self.path:
+                for record in reversed(applied): self.undo(record)
+
+    # --- GUI MOVES ---
+    def gui_moves(self, records):
+        # Replays internal moves from the current state and expands them into
+        # SolitaireGame moves, including the stock clicks for talon moves
+        out = []
+        for move, *_ in records:
+            kind = move[0]
+            if kind == 'tf':
+                out.append((move[1], len(self.piles[move[1]]) - 1, self._slot_for(self.piles[move[1]][-1])))
+            elif kind == 'tt':
+                out.append((move[1], move[2], move[3]))
+            else:
+                k = move[1]
+                out.extend([DRAW_MOVE] * self.talon_draws(k))
+                dst = self._slot_for(self.talon[k]) if kind == 'wf' else move[2]
+                out.append((WASTE_ID, k, dst))
+            self.apply(move)
+        return out
+
+    def _slot_for(self, c):
+        s = c // 13
+        return 7 + (self.slot_suit.index(s) if self.found[s] else self.slot_suit.index(-1))
+
+def solve(game, max_nodes=None, time_limit=None):
+    # Solve the position of a SolitaireGame without changing it
+    start = time.perf_counter()
+    solver = KlondikeSolver(game, max_nodes, time_limit)
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 5000))
+    nodes = 0
+    try:
+        if solver.search():
+            status = SOLVED
+        else:
+            # The pruned search came up empty: only an exhaustive one can
+            # prove the deal unsolvable, in whatever budget is left
+            nodes = solver.nodes
+            remaining = time_limit - (time.perf_counter() - start) if time_limit else None
+            if remaining is not None and remaining <= 0: raise _OutOfBudget()
+            solver = KlondikeSolver(game, max_nodes and max_nodes - nodes, remaining, prune=False)
+            status = SOLVED if solver.search() else UNSOLVABLE
+    except _OutOfBudget:
+        status = UNKNOWN
+    moves = KlondikeSolver(game).gui_moves(solver.path) if status == SOLVED else []
+    return SolveResult(status, moves, nodes + solver.nodes, time.perf_counter() - start)
+
+def apply_solution(game, moves):
+    # Play moves through the game's own move_cards(); True if the game is won
+    for move in moves:
+        if not game.move_cards(*move): return False
+    return game.check_for_win()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve random Klondike deals")
+    parser.add_argument('--deals', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--time-limit', type=float, default=10.0, help="seconds per deal")
+    parser.add_argument('--check', action='store_true', help="replay each solution through SolitaireGame")
+    parser.add_argument('--draw', type=int, choices=(1, 3), default=1, help="cards per stock click")
+    args = parser.parse_args(argv)
+
+    counts = {SOLVED: 0, UNSOLVABLE: 0, UNKNOWN: 0}
+    times = []
+    for i in range(args.deals):
+        game = SolitaireGame(args.seed + i, args.draw)
+        result = solve(game, time_limit=args.time_limit)
+        counts[result.status] += 1
+        times.append(result.elapsed)
+        line = f"deal {args.seed + i}: {result.status:<10} {result.nodes:>8} nodes {result.elapsed:7.3f}s"
+        if result.solvable:
+            line += f" {len(result.moves)} moves"
+            if args.check: line += " (replayed ok)" if apply_solution(game, result.moves) else " (REPLAY FAILED)"
+        print(line)
+    times.sort()
+    print(f"solved {counts[SOLVED]}, unsolvable {counts[UNSOLVABLE]}, unknown {counts[UNKNOWN]}; "
+          f"median {times[len(times) // 2]:.3f}s, max {times[-1]:.3f}s")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,112 @@
+import argparse
+import random
+import sys
+import time
+
+from rules import UnoGame, COLORS, WILD, color_policy, first_valid_policy, play_game
+
+# Determinized Monte Carlo player. The searching player knows their own hand,
+# the discard pile and how many cards everyone holds; every other card is
+# somewhere in the other hands or the draw pile. Each round of the search
+# deals those unseen cards at random (a determinization), then plays every
+# candidate move on its own copy of that deal and finishes the game with a
+# fast rollout policy (color_policy for every seat). The move with the best
+# average result is played. Rounds continue until the time budget runs out
+# (or a fixed number of rollouts, for reproducible tournaments).
+#
+# search() only needs the game state, so the GUI runs it in a worker process
+# and keeps drawing frames while the CPU thinks.
+
+ROLLOUT_TURNS = 400      # A rollout still going after this many turns counts as a draw
+TOURNAMENT_ROLLOUTS = 32  # Rollouts per candidate move for montecarlo_policy
+
+def candidate_moves(game):
+    # Every distinct play (a Wild once per color), or drawing when there is
+    # none. Drawing while holding a playable card only ever won rollouts by
+    # noise, so it is not searched.
+    moves, seen = [], set()
+    for card in game.playable():
+        colors = COLORS if card.color == WILD else [None]
+        for color in colors:
+            key = (card.color, card.value, color)
+            if key in seen: continue  # Duplicate cards play the same
+            seen.add(key)
+            moves.append((card, color))
+    return moves or [None]
+
+def determinize(game, rng):
+    # A copy of the game with the cards the current player cannot see dealt
+    # at random, keeping every hand size
+    sample = game.copy(rng)
+    me = game.current
+    unseen = list(sample.deck.cards)
+    for player, hand in enumerate(sample.hands):
+        if player != me: unseen.extend(hand)
+    rng.shuffle(unseen)
+    pos = 0
+    for player, hand in enumerate(sample.hands):
+        if player == me: continue
+        size = len(hand)
+        hand.clear()
+        hand.extend(unseen[pos:pos + size])
+        pos += size
+    sample.deck.cards[:] = unseen[pos:]
+    return sample
+
+def search(game, budget=None, rollouts=None, rng=None, policy=color_policy):
+    # Best move for the current player as (hand index, color), or None to
+    # draw. Stops after `budget` seconds or `rollouts` per move, whichever
+    # is given; indexes keep the answer valid across processes.
+    rng = rng or random.Random()
+    moves = candidate_moves(game)
+    if len(moves) == 1: rollouts = 0  # Nothing to choose
+    me = game.current
+    deadline = time.perf_counter() + budget if budget is not None else None
+    policies = [policy] * game.players
+    scores = [0.0] * len(moves)
+    rounds = 0
+    while True:
+        if deadline is not None and time.perf_counter() >= deadline: break
+        if rollouts is not None and rounds >= rollouts: break
+        deal = determinize(game, rng)
+        for i, move in enumerate(moves):
+            sim = deal.copy()
+            if move: sim.play(*move)
+            else: sim.draw()
+            winner = play_game(sim, policies, sim.turns + ROLLOUT_TURNS)
+            scores[i] += 1.0 if winner == me else (1 / game.players if winner is None else 0.0)
+        rounds += 1
+    best = moves[max(range(len(moves)), key=scores.__getitem__)]
+    if best is None: return None
+    card, color = best
+    return game.hands[me].index(card), color
+
+def montecarlo_policy(game):
+    # Fixed rollout count, so tournament games stay reproducible
+    move = search(game, rollouts=TOURNAMENT_ROLLOUTS, rng=game.rng)
+    if move is None: return None
+    index, color = move
+    return game.hands[game.current][index], color
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time Monte Carlo searches on random UNO positions")
+    parser.add_argument('--positions', type=int, default=20)
+    parser.add_argument('--budget', type=float, default=0.5, help="seconds per search")
+    parser.add_argument('--players', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    for _ in range(args.positions):
+        game = UnoGame(args.players, rng=rng)
+        for _ in range(rng.randrange(20)):  # Play into the game a little
+            if game.winner is not None: break
+            move = first_valid_policy(game)
+            game.play(*move) if move else game.draw()
+        if game.winner is None: search(game, args.budget, rng=rng)
+    elapsed = time.perf_counter() - start
+    print(f"{args.positions} searches in {elapsed:.2f}s ({elapsed / max(args.positions, 1):.3f}s each)")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
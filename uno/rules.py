@@ -0,0 +1,377 @@
+import argparse
+import random
+import sys
+import time
+from itertools import islice
+
+# UNO rules as a pure state machine (no pygame) for 2 to 10 players. The GUI
+# drives it with one play() or draw() per click or CPU tick; simulations drive
+# it in a tight loop through play_game().
+#
+# Rules: a card can be played on the same color or value, and a Wild on
+# anything (the player names the new color). Skip skips the next player,
+# Reverse turns play around (with two players it acts as a Skip), +2 and
+# Wild +4 make the next player draw and lose their turn. Drawing takes one
+# card and ends the turn, as in the original game. When the draw pile runs out
+# the discard pile, except its top card, is shuffled into a new one.
+# Stacking (a house rule, off by default) lets the next player answer a draw
+# card with another one and pass the growing penalty on; whoever cannot draws
+# the whole stack.
+
+COLORS = ['Red', 'Green', 'Blue', 'Yellow']
+VALUES = ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9', 'Skip', 'Rev', '+2']
+WILD = 'Wild'
+SKIP, REVERSE, DRAW_TWO, DRAW_FOUR = 'Skip', 'Rev', '+2', '+4'
+DRAW_AMOUNTS = {DRAW_TWO: 2, DRAW_FOUR: 4}
+
+HAND_SIZE = 7
+HAND_SCAN_LIMIT = 15  # Hands up to this size are scanned; larger ones use their buckets
+MIN_PLAYERS, MAX_PLAYERS = 2, 10
+MAX_TURNS = 2000  # play_game() calls a game a draw after this many turns
+
+# Stacking house rules
+NO_STACKING = 'none'  # A draw card always makes the next player draw
+STACK_SAME = 'same'   # +2 answers +2 and +4 answers +4
+STACK_ANY = 'any'     # +4 answers either; +2 answers +2, or +4 in the named color
+STACKING_RULES = [NO_STACKING, STACK_SAME, STACK_ANY]
+
+class Card:
+    def __init__(self, color, value):
+        self.color = color
+        self.value = value
+        self.rect = None  # Where the GUI last drew the card
+
+    def __str__(self):
+        return f"{self.color} {self.value}"
+
+class Deck:
+    def __init__(self, rng=None):
+        self.cards = []
+        # Generate Number Cards & Actions
+        for color in COLORS:
+            self.cards.append(Card(color, '0'))
+            for val in VALUES[1:]:
+                self.cards.append(Card(color, val))
+                self.cards.append(Card(color, val))
+
+        # Generate Wilds
+        for _ in range(4):
+            self.cards.append(Card(WILD, WILD))
+            self.cards.append(Card(WILD, DRAW_FOUR))
+
+        (rng or random).shuffle(self.cards)
+
+    def draw(self):
+        return self.cards.pop() if self.cards else None
+
+class Hand:
+    # Cards in the order they were received, with a count per color kept up
+    # to date for get_best_color. self.cards maps each card to its arrival
+    # number, which keeps hand order for the GUI and for "first playable
+    # card" choices. A hand larger than HAND_SCAN_LIMIT is also indexed by
+    # color and by value (dicts used as ordered sets), so the playable cards
+    # come from the few buckets that can match instead of a scan; small
+    # hands, the usual case, skip the bucket upkeep.
+    def __init__(self, cards=()):
+        self.cards = {}
+        self.colors = dict.fromkeys(COLORS + [WILD], 0)
+        self.by_color = self.by_value = None  # Buckets, while the hand is large
+        self.received = 0
+        self.extend(cards)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def __contains__(self, card):
+        return card in self.cards
+
+    def __getitem__(self, index):
+        # O(n): walks the hand, so keep it off hot paths
+        if index < 0: index += len(self.cards)
+        card = next(islice(self.cards, index, None), None) if index >= 0 else None
+        if card is None: raise IndexError("hand index out of range")
+        return card
+
+    def index(self, card):
+        # O(n), like list.index
+        for i, held in enumerate(self.cards):
+            if held is card: return i
+        raise ValueError(f"{card} is not in the hand")
+
+    def append(self, card):
+        self.cards[card] = self.received
+        self.received += 1
+        self.colors[card.color] += 1
+        if self.by_color is not None:
+            self._bucket(card)
+        elif len(self.cards) > HAND_SCAN_LIMIT:
+            self.by_color, self.by_value = {}, {}
+            for held in self.cards: self._bucket(held)
+
+    def _bucket(self, card):
+        bucket = self.by_color.get(card.color)
+        if bucket is None: self.by_color[card.color] = {card: None}
+        else: bucket[card] = None
+        bucket = self.by_value.get(card.value)
+        if bucket is None: self.by_value[card.value] = {card: None}
+        else: bucket[card] = None
+
+    def extend(self, cards):
+        for card in cards: self.append(card)
+
+    def remove(self, card):
+        del self.cards[card]
+        self.colors[card.color] -= 1
+        if self.by_color is not None:
+            if len(self.cards) <= HAND_SCAN_LIMIT:
+                self.by_color = self.by_value = None
+            else:
+                del self.by_color[card.color][card]
+                del self.by_value[card.value][card]
+
+    def clear(self):
+        self.cards.clear()
+        for color in self.colors: self.colors[color] = 0
+        self.by_color = self.by_value = None
+
+    def count(self, color):
+        return self.colors[color]
+
+    def in_order(self, cards):
+        # The given cards of this hand, in hand order
+        return sorted(cards, key=self.cards.__getitem__)
+
+    def copy(self):
+        hand = Hand.__new__(Hand)
+        hand.cards = self.cards.copy()
+        hand.colors = self.colors.copy()
+        if self.by_color is None:
+            hand.by_color = hand.by_value = None
+        else:
+            hand.by_color = {color: bucket.copy() for color, bucket in self.by_color.items()}
+            hand.by_value = {value: bucket.copy() for value, bucket in self.by_value.items()}
+        hand.received = self.received
+        return hand
+
+def is_valid_move(card, top_card, current_color):
+    if card.color == WILD: return True
+    if card.color == current_color: return True
+    if card.value == top_card.value: return True
+    return False
+
+def get_best_color(hand):
+    # The color held most often, for a Wild; ties go to the first in COLORS,
+    # so the choice does not depend on set ordering (Red for no colors)
+    return max(COLORS, key=hand.colors.__getitem__)
+
+class UnoGame:
+    def __init__(self, players=2, stacking=NO_STACKING, rng=None):
+        if not MIN_PLAYERS <= players <= MAX_PLAYERS:
+            raise ValueError(f"UNO needs {MIN_PLAYERS} to {MAX_PLAYERS} players")
+        if stacking not in STACKING_RULES: raise ValueError(f"unknown stacking rule {stacking!r}")
+        self.rng = rng or random
+        self.players = players
+        self.stacking = stacking
+        self.deck = Deck(self.rng)
+        self.hands = [Hand(self.deck.draw() for _ in range(HAND_SIZE)) for _ in range(players)]
+
+        # Initial Discard (never a Wild, same as the original game)
+        card = self.deck.draw()
+        while card.color == WILD:
+            self.deck.cards.insert(0, card)
+            card = self.deck.draw()
+        self.discard = [card]
+        self.current_color = card.color
+
+        self.current = 0       # Player whose turn it is
+        self.direction = 1     # -1 after an odd number of Reverses
+        self.pending_draw = 0  # Stacked penalty the current player must answer or draw
+        self.winner = None
+        self.turns = 0
+
+    # --- QUERIES ---
+    def top_card(self):
+        return self.discard[-1]
+
+    def current_hand(self):
+        return self.hands[self.current]
+
+    def next_player(self, steps=1):
+        return (self.current + self.direction * steps) % self.players
+
+    def can_play(self, card):
+        top = self.discard[-1]
+        if self.pending_draw:
+            # Only a draw card can answer a stacked penalty
+            if card.value not in DRAW_AMOUNTS: return False
+            if self.stacking == STACK_SAME: return card.value == top.value
+        return is_valid_move(card, top, self.current_color)
+
+    def playable(self):
+        # The playable cards of the current hand, in hand order. Below
+        # HAND_SCAN_LIMIT a plain scan is faster than sorting bucket matches.
+        hand = self.hands[self.current]
+        if hand.by_color is None:
+            can_play = self.can_play
+            return [card for card in hand.cards if can_play(card)]
+        return hand.in_order(self._matches(hand))
+
+    def first_playable(self):
+        # The first playable card of the current hand in hand order, or None
+        hand = self.hands[self.current]
+        if hand.by_color is None:
+            for card in hand.cards:
+                if self.can_play(card): return card
+            return None
+        return min(self._matches(hand), key=hand.cards.__getitem__, default=None)
+
+    def _matches(self, hand):
+        # The playable cards of an indexed hand, in no particular order,
+        # gathered from the buckets that can match: the current color, the
+        # top card's value and Wilds (or just the answering draw cards under a
+        # stacked penalty)
+        top, color = self.discard[-1], self.current_color
+        by_color, by_value = hand.by_color, hand.by_value
+        if self.pending_draw:
+            if self.stacking == STACK_SAME: return list(by_value.get(top.value, ()))
+            matches = list(by_value.get(DRAW_FOUR, ()))
+            matches.extend(card for card in by_value.get(DRAW_TWO, ()) if top.value == DRAW_TWO or card.color == color)
+            return matches
+        matches = list(by_color.get(color, ()))
+        matches.extend(card for card in by_value.get(top.value, ()) if card.color != color and card.color != WILD)
+        matches.extend(by_color.get(WILD, ()))
+        return matches
+
+    def copy(self, rng=None):
+        # Independent game state for search; the Card objects are shared
+        game = UnoGame.__new__(UnoGame)
+        game.__dict__.update(self.__dict__)
+        game.rng = rng or self.rng
+        game.deck = Deck.__new__(Deck)
+        game.deck.cards = self.deck.cards[:]
+        game.hands = [hand.copy() for hand in self.hands]
+        game.discard = self.discard[:]
+        return game
+
+    def _require(self, allowed, action):
+        if not allowed: raise ValueError(f"cannot {action}: the game is over")
+
+    # --- ACTIONS ---
+    def play(self, card, color=None):
+        # Play a card from the current hand; a Wild needs the color to name
+        self._require(self.winner is None, "play")
+        hand = self.hands[self.current]
+        if card not in hand.cards or not self.can_play(card): raise ValueError(f"cannot play {card}")
+        if card.color == WILD:
+            if color not in COLORS: raise ValueError(f"{card} needs a color, one of {COLORS}")
+        else:
+            color = card.color
+        hand.remove(card)
+        self.discard.append(card)
+        self.current_color = color
+        self.turns += 1
+        if not hand.cards:
+            self.winner = self.current
+            return
+
+        skip = False
+        value = card.value
+        if value == SKIP:
+            skip = True
+        elif value == REVERSE:
+            if self.players == 2: skip = True
+            else: self.direction = -self.direction
+        elif value in DRAW_AMOUNTS:
+            self.pending_draw += DRAW_AMOUNTS[value]
+            if self.stacking == NO_STACKING:
+                self.give(self.next_player(), self.pending_draw)
+                self.pending_draw = 0
+                skip = True
+        self.current = self.next_player(2 if skip else 1)
+
+    def draw(self):
+        # Take one card, or the whole stacked penalty, and end the turn.
+        # Returns the number of cards drawn.
+        self._require(self.winner is None, "draw")
+        drawn = self.give(self.current, self.pending_draw or 1)
+        self.pending_draw = 0
+        self.turns += 1
+        self.current = self.next_player()
+        return drawn
+
+    def give(self, player, count):
+        # Deal count cards to a player, reshuffling the discard pile when the
+        # draw pile runs out. Returns fewer only if every other card is held.
+        hand, cards = self.hands[player], self.deck.cards
+        for i in range(count):
+            if not cards:
+                self.reshuffle()
+                if not cards: return i
+            hand.append(cards.pop())
+        return count
+
+    def reshuffle(self):
+        # The top card stays; the rest become the new draw pile
+        cards = self.discard[:-1]
+        del self.discard[:-1]
+        self.rng.shuffle(cards)
+        self.deck.cards.extend(cards)
+
+# --- BATCH PLAY ---
+def first_valid_policy(game):
+    # The original CPU: the first playable card in hand order, and the most
+    # common color in hand for a Wild
+    card = game.first_playable()
+    if card is None: return None
+    return card, (get_best_color(game.hands[game.current]) if card.color == WILD else None)
+
+def color_policy(game):
+    # Play toward the color held most (get_best_color): that color first,
+    # other colors next and Wilds last, draw cards before plain ones
+    hand = game.hands[game.current]
+    best = get_best_color(hand)
+    choice, choice_rank = None, None
+    for card in game.playable():
+        rank = (card.color == WILD, card.color != best, card.value not in DRAW_AMOUNTS)
+        if choice is None or rank < choice_rank:
+            choice, choice_rank = card, rank
+    if choice is None: return None
+    return choice, (best if choice.color == WILD else None)
+
+def play_game(game, policies, max_turns=MAX_TURNS):
+    # policies[i](game) returns (card, color) to play, or None to draw.
+    # Returns the winner, or None if nobody won within max_turns.
+    while game.winner is None and game.turns < max_turns:
+        move = policies[game.current](game)
+        if move: game.play(*move)
+        else: game.draw()
+    return game.winner
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play UNO games through the rules engine")
+    parser.add_argument('--games', type=int, default=10_000)
+    parser.add_argument('--players', type=int, default=2, choices=range(MIN_PLAYERS, MAX_PLAYERS + 1))
+    parser.add_argument('--stacking', choices=STACKING_RULES, default=NO_STACKING)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    policies = [first_valid_policy] * args.players
+    wins = [0] * args.players
+    turns = unfinished = 0
+    start = time.perf_counter()
+    for _ in range(args.games):
+        game = UnoGame(args.players, args.stacking, rng)
+        winner = play_game(game, policies)
+        turns += game.turns
+        if winner is None: unfinished += 1
+        else: wins[winner] += 1
+    elapsed = time.perf_counter() - start
+    print(f"{args.games} games, {turns} turns in {elapsed:.2f}s ({turns / max(elapsed, 1e-9):,.0f} turns/s)")
+    print("wins by seat: " + ", ".join(f"{w / max(args.games, 1):.1%}" for w in wins) + f"; unfinished {unfinished}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,179 @@
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from rules import (UnoGame, COLORS, WILD, NO_STACKING, STACKING_RULES, MIN_PLAYERS, MAX_PLAYERS, MAX_TURNS,
+                   color_policy, first_valid_policy, play_game)
+from montecarlo import montecarlo_policy
+
+# Tournament between UNO policies. Every game seats randomly chosen policies
+# (distinct ones while there are enough) on a deal seeded from the run seed
+# and the game number, so a game can be replayed on its own. Games run on a
+# process pool in batches and every game appends one JSON line to the output
+# file; the first line records the run settings. Running the same command
+# again resumes after the last complete game.
+#
+# Ratings are Bradley-Terry (Elo) strengths fitted to pairwise results: the
+# winner of a game beats every other policy at the table. The intervals are
+# 95% normal approximations from the fit's curvature.
+
+GAMES_PER_TASK = 256  # Games per pool task; a game takes well under a millisecond
+ELO_SCALE = 400 / math.log(10)
+ELO_BASE = 1500  # Average rating
+
+# --- POLICIES ---
+# A policy takes the game and returns (card, color) to play or None to draw,
+# the same contract as rules.play_game()
+def random_policy(game):
+    # A random playable card and a random color
+    moves = game.playable()
+    if not moves: return None
+    card = game.rng.choice(moves)
+    return card, (game.rng.choice(COLORS) if card.color == WILD else None)
+
+POLICIES = {
+    'first': first_valid_policy,  # The original CPU
+    'color': color_policy,
+    'random': random_policy,
+    'montecarlo': montecarlo_policy,  # Determinized search with a fixed rollout count
+}
+
+# --- GAMES ---
+def game_rng(seed, game):
+    return random.Random(seed << 40 | game)
+
+def play_one(seed, game, names, players, stacking):
+    # Returns the summary line for one game
+    rng = game_rng(seed, game)
+    if players <= len(names): seats = rng.sample(range(len(names)), players)
+    else: seats = [rng.randrange(len(names)) for _ in range(players)]
+    uno = UnoGame(players, stacking, rng)
+    winner = play_game(uno, [POLICIES[names[i]] for i in seats])
+    return {'game': game, 'seats': seats, 'winner': winner, 'turns': uno.turns}
+
+def _play_worker(args):
+    seed, start, stop, names, players, stacking = args
+    return [play_one(seed, game, names, players, stacking) for game in range(start, stop)]
+
+def play_games(seed, start, stop, names, players, stacking, workers=None):
+    # Yields summaries in game order
+    workers = workers or os.cpu_count() or 1
+    tasks = [(seed, i, min(i + GAMES_PER_TASK, stop), names, players, stacking)
+             for i in range(start, stop, GAMES_PER_TASK)]
+    if workers == 1:
+        for task in tasks: yield from _play_worker(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for batch in pool.map(_play_worker, tasks, chunksize=1):
+            yield from batch
+
+# --- RESULTS FILE ---
+def read_results(path):
+    # (settings, summaries) from a results file. A torn last line (from an
+    # interrupted run) is cut off so appending continues cleanly.
+    with open(path, 'rb+') as f:
+        data = f.read()
+        end = data.rfind(b'\n') + 1
+        if end < len(data): f.truncate(end)
+    lines = data[:end].splitlines()
+    if not lines: return None, []
+    return json.loads(lines[0]), [json.loads(line) for line in lines[1:]]
+
+# --- RATINGS ---
+class Standings:
+    def __init__(self, names):
+        k = len(names)
+        self.names = names
+        self.games = [0] * k             # Seats played
+        self.wins = [0] * k
+        self.beat = [[0] * k for _ in range(k)]  # beat[i][j]: i won with j at the table
+        self.unfinished = 0
+        self.turns = 0
+
+    def add(self, summary):
+        seats, winner = summary['seats'], summary['winner']
+        self.turns += summary['turns']
+        for i in seats: self.games[i] += 1
+        if winner is None:
+            self.unfinished += 1
+            return
+        w = seats[winner]
+        self.wins[w] += 1
+        for seat, i in enumerate(seats):
+            if seat != winner and i != w: self.beat[w][i] += 1
+
+    def ratings(self, iterations=200):
+        # Bradley-Terry fit by minorization-maximization (Hunter 2004), with a
+        # half win each way per pair that met so a winless policy stays finite.
+        # Returns [(elo, 95% half-width)] in policy order.
+        k = len(self.names)
+        wins = [[self.beat[i][j] + 0.5 if self.beat[i][j] + self.beat[j][i] else 0 for j in range(k)] for i in range(k)]
+        pairs = [[wins[i][j] + wins[j][i] for j in range(k)] for i in range(k)]
+        strength = [1.0] * k
+        for _ in range(iterations):
+            for i in range(k):
+                total = sum(pairs[i][j] / (strength[i] + strength[j]) for j in range(k) if j != i)
+                if total: strength[i] = sum(wins[i]) / total
+            mean = sum(math.log(s) for s in strength if s > 0) / k
+            strength = [s / math.exp(mean) for s in strength]
+        result = []
+        for i in range(k):
+            info = sum(pairs[i][j] * strength[i] * strength[j] / (strength[i] + strength[j]) ** 2
+                       for j in range(k) if j != i)
+            elo = ELO_BASE + ELO_SCALE * math.log(strength[i]) if strength[i] > 0 else float('nan')
+            result.append((elo, 1.96 * ELO_SCALE / math.sqrt(info) if info else float('inf')))
+        return result
+
+    def report(self, players):
+        total = sum(self.games) // players
+        lines = [f"{total} games, {self.unfinished} unfinished, {self.turns / max(total, 1):.1f} turns per game"]
+        lines.append(f"{'policy':<10} {'seats':>9} {'win rate':>9} {'elo':>7}")
+        for name, games, wins, (elo, ci) in zip(self.names, self.games, self.wins, self.ratings()):
+            lines.append(f"{name:<10} {games:>9} {wins / max(games, 1):>9.1%} {elo:>7.0f} ± {ci:.0f}")
+        return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play UNO policies against each other and rate them")
+    parser.add_argument('--policies', nargs='+', choices=sorted(POLICIES), default=['first', 'color', 'random'])
+    parser.add_argument('--games', type=int, default=100_000, help="total games in the run (resumes up to this)")
+    parser.add_argument('--players', type=int, default=2, choices=range(MIN_PLAYERS, MAX_PLAYERS + 1))
+    parser.add_argument('--stacking', choices=STACKING_RULES, default=NO_STACKING)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--out', default="tournament.jsonl", help="per-game results, resumed if it exists")
+    args = parser.parse_args(argv)
+
+    settings = {'policies': args.policies, 'players': args.players, 'stacking': args.stacking,
+                'seed': args.seed, 'max_turns': MAX_TURNS}
+    done = []
+    if os.path.exists(args.out):
+        saved, done = read_results(args.out)
+        if saved and saved != settings:
+            parser.error(f"{args.out} was written with different settings: {saved}")
+    standings = Standings(args.policies)
+    for summary in done: standings.add(summary)
+    if done: print(f"resuming after {len(done)} games", file=sys.stderr)
+
+    start, played = time.perf_counter(), 0
+    with open(args.out, 'a') as f:
+        if f.tell() == 0: f.write(json.dumps(settings) + "\n")
+        for summary in play_games(args.seed, len(done), args.games, args.policies, args.players,
+                                  args.stacking, args.workers):
+            f.write(json.dumps(summary) + "\n")
+            standings.add(summary)
+            played += 1
+            if played % 100_000 == 0:
+                f.flush()
+                print(f"{len(done) + played}/{args.games} games, "
+                      f"{played / (time.perf_counter() - start):,.0f} games/s", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+    if played: print(f"{played} games in {elapsed:.1f}s ({played / max(elapsed, 1e-9):,.0f} games/s)")
+    print(standings.report(args.players))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
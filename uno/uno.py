@@ -1,6 +1,12 @@
+import multiprocessing
 import pygame
 import random
 import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from montecarlo import search
+from rules import UnoGame, get_best_color, SKIP, REVERSE, DRAW_TWO, DRAW_FOUR, WILD
 
 # --- Constants ---
 SCREEN_WIDTH, SCREEN_HEIGHT = 900, 600
@@ -15,59 +21,48 @@ YELLOW = (255, 170, 0)
 BLACK = (50, 50, 50)
 WHITE = (255, 255, 255)
 
-COLORS = ['Red', 'Green', 'Blue', 'Yellow']
 COLOR_MAP = {'Red': RED, 'Green': GREEN, 'Blue': BLUE, 'Yellow': YELLOW, 'Wild': BLACK}
-VALUES = ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9', 'Skip', 'Rev', '+2']
-
-# --- Classes ---
-class Card:
-    def __init__(self, color, value):
-        self.color = color
-        self.value = value
-        self.rect = None
-        
-    def __str__(self):
-        return f"{self.color} {self.value}"
-
-    def get_draw_color(self):
-        return COLOR_MAP.get(self.color, BLACK)
-
-class Deck:
-    def __init__(self):
-        self.cards = []
-        # Generate Number Cards & Actions
-        for color in COLORS:
-            self.cards.append(Card(color, '0'))
-            for val in VALUES[1:]:
-                self.cards.append(Card(color, val))
-                self.cards.append(Card(color, val))
-        
-        # Generate Wilds
-        for _ in range(4):
-            self.cards.append(Card('Wild', 'Wild'))
-            self.cards.append(Card('Wild', '+4'))
-            
-        random.shuffle(self.cards)
 
-    def draw(self):
-        return self.cards.pop() if self.cards else None
-
-# --- Game Logic ---
-def is_valid_move(card, top_card, current_color):
-    if card.color == 'Wild': return True
-    if card.color == current_color: return True
-    if card.value == top_card.value: return True
-    return False
-
-def get_best_color(hand):
-    # Counts colors in hand to pick best one for Wild
-    colors = [c.color for c in hand if c.color in COLORS]
-    if not colors: return 'Red' # Default
-    return max(set(colors), key=colors.count)
+# --- Text ---
+# pygame.font.SysFont() searches the system font table and loads the font file
+# on every call, which draw_text used to do for every label each frame. The
+# font file is resolved once per (family, bold) at startup, Font objects are
+# kept per (family, size, bold) and rendered labels go through a small LRU
+# cache keyed by (text, size, color).
+FONT_FAMILY = 'Arial'
+TEXT_CACHE_SIZE = 256
+font_files = {}              # (family, bold) -> (path, needs synthetic bold)
+fonts = {}                   # (family, size, bold) -> Font
+text_cache = OrderedDict()   # (text, size, color) -> Surface
+
+def resolve_font(family=FONT_FAMILY, bold=True):
+    # Let SysFont pick the file, but keep the path instead of building a Font
+    key = (family, bold)
+    if key not in font_files:
+        font_files[key] = pygame.font.SysFont(family, 1, bold, constructor=lambda path, size, b, i: (path, b))
+    return font_files[key]
+
+def get_font(size, family=FONT_FAMILY, bold=True):
+    key = (family, size, bold)
+    font = fonts.get(key)
+    if font is None:
+        path, synthetic_bold = resolve_font(family, bold)
+        font = fonts[key] = pygame.font.Font(path, size)
+        font.set_bold(synthetic_bold)
+    return font
+
+def render_text(text, size, color):
+    key = (text, size, tuple(color))
+    img = text_cache.get(key)
+    if img is None:
+        img = text_cache[key] = get_font(size).render(text, True, color)
+        if len(text_cache) > TEXT_CACHE_SIZE: text_cache.popitem(last=False)
+    else:
+        text_cache.move_to_end(key)
+    return img
 
 def draw_text(surface, text, x, y, size=30, color=WHITE, center=False):
-    font = pygame.font.SysFont('Arial', size, bold=True)
-    img = font.render(text, True, color)
+    img = render_text(text, size, color)
     if center:
         rect = img.get_rect(center=(x, y))
         surface.blit(img, rect)
@@ -82,7 +77,7 @@ def draw_card(surface, card, x, y, hidden=False):
         pygame.draw.rect(surface, WHITE, rect, 2, border_radius=8)
         draw_text(surface, "UNO", x + CARD_WIDTH//2, y + CARD_HEIGHT//2, 20, RED, True)
     else:
-        col = card.get_draw_color()
+        col = COLOR_MAP.get(card.color, BLACK)
         pygame.draw.rect(surface, col, rect, border_radius=8)
         pygame.draw.rect(surface, WHITE, rect, 2, border_radius=8)
         
@@ -91,7 +86,7 @@ def draw_card(surface, card, x, y, hidden=False):
         
         # Value text
         txt_col = col if col != YELLOW else (200, 140, 0) # Darker yellow for text visibility
-        if card.color == 'Wild': txt_col = BLACK
+        if card.color == WILD: txt_col = BLACK
             
         display_val = card.value
         if display_val == 'Skip': display_val = "⊘"
@@ -105,150 +100,107 @@ def draw_card(surface, card, x, y, hidden=False):
     card.rect = rect
 
 # --- Main Game Loop ---
+PLAYER, CPU = 0, 1  # Seats in the rules engine
+CPU_DELAY = 1000    # ms the CPU searches before each move (the search deadline)
+
+def effect_message(card, target):
+    # Status line after a card that made the other side lose their turn
+    if card.value in (SKIP, REVERSE): return f"{target} Skipped!" if target == "CPU" else "You were Skipped!"
+    if card.value in (DRAW_TWO, DRAW_FOUR): return f"{target} Draw {card.value[1]} & Skipped!"
+    return None
+
 def main():
+    # The CPU searches in a worker process so frames keep coming while it
+    # thinks. The worker is spawned rather than forked, and started before
+    # pygame opens the display, so it never inherits SDL's state; start it now
+    # rather than on the CPU's first turn.
+    searcher = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+    searcher.submit(int)
+
     pygame.init()
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    resolve_font()  # Scan the system fonts now rather than on the first frame
     pygame.display.set_caption("UNO - Linux Python")
     clock = pygame.time.Clock()
 
-    deck = Deck()
-    player_hand = [deck.draw() for _ in range(7)]
-    cpu_hand = [deck.draw() for _ in range(7)]
-    
-    # Initial Discard (Ensure not Wild for simplicity)
-    discard = deck.draw()
-    while discard.color == 'Wild':
-        deck.cards.insert(0, discard)
-        discard = deck.draw()
-    
-    discard_pile = [discard]
-    current_color = discard.color
-    
-    game_over = False
+    game = UnoGame(players=2, rng=random.Random())  # Its own generator, so the game can be sent to the searcher
+    player_hand, cpu_hand = game.hands[PLAYER], game.hands[CPU]
+
     message = "Your Turn"
-    player_turn = True
-    cpu_timer = 0
-    
+    cpu_timer = 0     # Deadline for the CPU's move
+    cpu_search = None  # Future of the running search
+
     while True:
         current_time = pygame.time.get_ticks()
-        
+
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                searcher.shutdown(wait=False, cancel_futures=True)
                 pygame.quit(); sys.exit()
-            
+
             # --- Player Interaction ---
-            if not game_over and player_turn and event.type == pygame.MOUSEBUTTONDOWN:
+            if game.winner is None and game.current == PLAYER and event.type == pygame.MOUSEBUTTONDOWN:
                 pos = pygame.mouse.get_pos()
-                
+
                 # Draw Pile
                 draw_rect = pygame.Rect(SCREEN_WIDTH//2 + 60, SCREEN_HEIGHT//2 - 50, CARD_WIDTH, CARD_HEIGHT)
                 if draw_rect.collidepoint(pos):
-                    new_card = deck.draw()
-                    if new_card: player_hand.append(new_card)
-                    player_turn = False
-                    cpu_timer = current_time + 1000
+                    game.draw()
+                    cpu_timer = current_time + CPU_DELAY
                     message = "CPU Thinking..."
-                
+
                 # Card Play
                 else:
                     for card in player_hand:
-                        if card.rect and card.rect.collidepoint(pos):
-                            if is_valid_move(card, discard_pile[-1], current_color):
-                                player_hand.remove(card)
-                                discard_pile.append(card)
-                                
-                                # Effects
-                                if card.color == 'Wild':
-                                    # Auto-pick best color for player ease
-                                    current_color = get_best_color(player_hand)
-                                else:
-                                    current_color = card.color
-                                
-                                # Action Cards
-                                turn_skip = False
-                                if card.value == 'Skip' or card.value == 'Rev': # Rev is Skip in 1v1
-                                    turn_skip = True
-                                    message = "CPU Skipped!"
-                                elif card.value == '+2':
-                                    for _ in range(2): cpu_hand.append(deck.draw())
-                                    turn_skip = True
-                                    message = "CPU Draw 2 & Skipped!"
-                                elif card.value == '+4':
-                                    for _ in range(4): cpu_hand.append(deck.draw())
-                                    turn_skip = True
-                                    message = "CPU Draw 4 & Skipped!"
-
-                                if turn_skip:
-                                    player_turn = True # It's player turn again
-                                else:
-                                    player_turn = False
-                                    cpu_timer = current_time + 1000
-                                    message = "CPU Thinking..."
-                                break
+                        if card.rect and card.rect.collidepoint(pos) and game.can_play(card):
+                            # Auto-pick best color for player ease
+                            game.play(card, get_best_color(player_hand) if card.color == WILD else None)
+                            if game.current == PLAYER:
+                                message = effect_message(card, "CPU")
+                            else:
+                                cpu_timer = current_time + CPU_DELAY
+                                message = "CPU Thinking..."
+                            break
 
         # --- CPU Logic ---
-        if not game_over and not player_turn and current_time >= cpu_timer:
-            played = False
-            
-            # Simple AI
-            for card in cpu_hand:
-                if is_valid_move(card, discard_pile[-1], current_color):
-                    cpu_hand.remove(card)
-                    discard_pile.append(card)
-                    
-                    if card.color == 'Wild':
-                        current_color = get_best_color(cpu_hand)
-                    else:
-                        current_color = card.color
-                    
-                    # Effects
-                    turn_skip = False
-                    if card.value == 'Skip' or card.value == 'Rev':
-                        turn_skip = True
-                        message = "You were Skipped!"
-                    elif card.value == '+2':
-                        for _ in range(2): player_hand.append(deck.draw())
-                        turn_skip = True
-                        message = "You Draw 2 & Skipped!"
-                    elif card.value == '+4':
-                        for _ in range(4): player_hand.append(deck.draw())
-                        turn_skip = True
-                        message = "You Draw 4 & Skipped!"
-
-                    if turn_skip:
+        # Search until cpu_timer on a snapshot of the game, then play the
+        # answer. A forced move comes back at once but still waits for
+        # cpu_timer, so the CPU's pace stays the same.
+        if game.winner is None and game.current == CPU:
+            if cpu_search is None:
+                cpu_search = searcher.submit(search, game.copy(), max(cpu_timer - current_time, 0) / 1000)
+            elif cpu_search.done() and current_time >= cpu_timer:
+                move = cpu_search.result()
+                cpu_search = None
+                if move is None:
+                    game.draw()
+                    message = "Your Turn"
+                else:
+                    index, color = move
+                    card = cpu_hand[index]
+                    game.play(card, color)
+                    if game.current == CPU:
                         # CPU goes again effectively (reset timer)
-                        cpu_timer = current_time + 1000 
+                        cpu_timer = current_time + CPU_DELAY
+                        message = effect_message(card, "You")
                     else:
-                        player_turn = True
                         message = "Your Turn"
-                    
-                    played = True
-                    break
-            
-            if not played:
-                new_card = deck.draw()
-                if new_card: cpu_hand.append(new_card)
-                player_turn = True
-                message = "Your Turn"
 
         # --- Check Win ---
-        if not player_hand:
-            game_over = True
+        if game.winner == PLAYER:
             message = "YOU WIN!"
-        elif not cpu_hand:
-            game_over = True
+        elif game.winner == CPU:
             message = "CPU WINS!"
 
         # --- Rendering ---
         screen.fill(BG_COLOR)
-        
+
         # Center Pile
-        top_card = discard_pile[-1]
-        draw_card(screen, top_card, SCREEN_WIDTH//2 - 40, SCREEN_HEIGHT//2 - 50)
-        
+        draw_card(screen, game.top_card(), SCREEN_WIDTH//2 - 40, SCREEN_HEIGHT//2 - 50)
+
         # Current Color Indicator (Circle)
-        pygame.draw.circle(screen, COLOR_MAP.get(current_color, BLACK), (SCREEN_WIDTH//2 - 90, SCREEN_HEIGHT//2), 15)
-        
+        pygame.draw.circle(screen, COLOR_MAP.get(game.current_color, BLACK), (SCREEN_WIDTH//2 - 90, SCREEN_HEIGHT//2), 15)
+
         # Draw Pile
         pygame.draw.rect(screen, BLACK, (SCREEN_WIDTH//2 + 60, SCREEN_HEIGHT//2 - 50, CARD_WIDTH, CARD_HEIGHT), border_radius=8)
         pygame.draw.rect(screen, WHITE, (SCREEN_WIDTH//2 + 60, SCREEN_HEIGHT//2 - 50, CARD_WIDTH, CARD_HEIGHT), 2, border_radius=8)
@@ -266,7 +218,7 @@ def main():
 
         # UI Text
         draw_text(screen, message, 20, SCREEN_HEIGHT - 40)
-        draw_text(screen, f"Current Color: {current_color}", 20, 20, 20, WHITE)
+        draw_text(screen, f"Current Color: {game.current_color}", 20, 20, 20, WHITE)
 
         # "UNO" Shouts
         if len(player_hand) == 1: